@@ -0,0 +1,452 @@
+# -*- coding: utf-8 -*-
+"""
+Compile translations.ts into one lazily loaded bundle per locale.
+
+Each bundle is an ES module holding [keys, strings, refs, fragments,
+templates]: the keys in file order, every distinct value once (interned),
+for each key the index of its value, the long blocks several values
+repeat (see fragments.py) and the values with {{slots}} precompiled into
+literal and slot parts (see templates.py). Keys missing from a locale are
+filled from en at build time, matching the t() fallback, so the client
+only ever fetches the active locale. The payload is wrapped in
+JSON.parse('...'), which engines parse faster than the equivalent object
+literal.
+
+loader.ts exposes loadLocale(locale) -> Promise<{ [key]: string }> built
+on dynamic import(), so bundlers split every locale into its own chunk,
+and render(text, params), which fills a loaded template from its parts.
+
+With --chunks each locale is further split along the component import
+graph: every component App.tsx imports (and every service) is a route
+whose chunk holds the keys only it and its own imports use, and keys used
+by App.tsx, Header, Navigation, WelcomeScreen or by several routes go to a
+small core chunk. Keys no source references go to a "rest" chunk. The
+loader then also exposes loadChunk(locale, chunk), so the first paint only
+waits for core.
+
+    python build_i18n.py [--file translations.ts] [--out i18n] [--chunks]
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+
+from fragments import MARKER_CLOSE, MARKER_OPEN, factor
+from key_usage import source_files, usage_index
+from templates import compile_template, hot_shapes
+from translations_editor import write_atomic
+from translations_model import TRANSLATIONS_FILE, load_translations
+
+OUTPUT_DIR = 'i18n'
+FALLBACK_LOCALE = 'en'
+HEADER = '// Generated by build_i18n.py from translations.ts; do not edit.\n'
+
+CORE_CHUNK = 'core'
+REST_CHUNK = 'rest'
+# Rendered before any route is chosen, so their keys always go to core
+CORE_SOURCES = ('App.tsx', 'index.tsx', 'components/Header.tsx',
+                'components/Navigation.tsx', 'components/WelcomeScreen.tsx')
+ENTRY_SOURCE = 'App.tsx'
+
+DECODE_FUNCTION = '''type Part = number | string;
+type Bundle = [string[], string[], number[], string[][], [number, Part[]][]];
+export type Params = {{ [name: string]: string }};
+type Renderer = (parts: string[], params: Params) => string;
+
+// Renderers specialised to the slot sequence of the hot templates
+const RENDERERS: {{ [shape: string]: Renderer }} = {{
+{renderers}
+}};
+
+function renderParts(parts: string[], params: Params): string {{
+    let out = parts[0];
+    for (let i = 1; i < parts.length; i += 2) {{
+        const value = params[parts[i]];
+        out += (value === undefined ? `{{{{${{parts[i]}}}}}}` : value) + parts[i + 1];
+    }}
+    return out;
+}}
+
+const compiled = new Map<string, {{ parts: string[], run: Renderer }}>();
+
+export function render(text: string, params?: Params): string {{
+    const template = params && compiled.get(text);
+    return template ? template.run(template.parts, params) : text;
+}}
+
+function joinParts(parts: string[]): string {{
+    return parts.map((part, i) => i % 2 ? `{{{{${{part}}}}}}` : part).join('');
+}}
+
+// Template parts with every fragment marker replaced by the fragment's own
+// parts, so slots inside a shared block stay slots
+function spliceParts(encoded: Part[], strings: string[], fragments: string[][]): string[] {{
+    const parts = [''];
+    encoded.forEach((part, i) => {{
+        if (i % 2) {{
+            parts.push(part as string, '');
+            return;
+        }}
+        strings[part as number].split(/\\uE000(\\d+)\\uE001/).forEach((piece, j) => {{
+            if (j % 2) {{
+                const fragment = fragments[+piece];
+                parts[parts.length - 1] += fragment[0];
+                parts.push(...fragment.slice(1));
+            }} else {{
+                parts[parts.length - 1] += piece;
+            }}
+        }});
+    }});
+    return parts;
+}}
+
+function decode([keys, strings, refs, fragments, templates]: Bundle): Messages {{
+    const factored = strings;
+    if (fragments.length) {{
+        strings = strings.map(text => text.replace(/\\uE000(\\d+)\\uE001/g, (_, i) => joinParts(fragments[+i])));
+    }}
+    for (const [index, encoded] of templates) {{
+        const parts = spliceParts(encoded, factored, fragments);
+        const text = joinParts(parts);
+        strings[index] = text;
+        compiled.set(text, {{ parts, run: RENDERERS[parts.filter((_, i) => i % 2).join(',')] || renderParts }});
+    }}
+    const messages: Messages = {{}};
+    for (let i = 0; i < keys.length; i++) {{
+        messages[keys[i]] = strings[refs[i]];
+    }}
+    return messages;
+}}
+'''
+
+LOADER_TEMPLATE = HEADER + '''export type Messages = {{ [key: string]: string }};
+
+{decode}
+const bundles: {{ [locale: string]: () => Promise<{{ default: Bundle }}> }} = {{
+{imports}
+}};
+
+export const LOCALES = {locales};
+export const FALLBACK_LOCALE = {fallback};
+
+const cache: {{ [locale: string]: Promise<Messages> }} = {{}};
+
+export function loadLocale(locale: string): Promise<Messages> {{
+    const name = locale in bundles ? locale : FALLBACK_LOCALE;
+    if (!cache[name]) {{
+        cache[name] = bundles[name]().then(module => decode(module.default));
+    }}
+    return cache[name];
+}}
+'''
+
+CHUNKED_LOADER_TEMPLATE = HEADER + '''export type Messages = {{ [key: string]: string }};
+
+{decode}
+const chunks: {{ [locale: string]: {{ [chunk: string]: () => Promise<{{ default: Bundle }}> }} }} = {{
+{imports}
+}};
+
+export const LOCALES = {locales};
+export const FALLBACK_LOCALE = {fallback};
+export const CHUNKS = {chunks};
+export const CORE_CHUNK = {core};
+
+const cache: {{ [id: string]: Promise<Messages> }} = {{}};
+
+export function loadChunk(locale: string, chunk: string): Promise<Messages> {{
+    const name = locale in chunks ? locale : FALLBACK_LOCALE;
+    const id = `${{name}}/${{chunk}}`;
+    if (!cache[id]) {{
+        const load = chunks[name][chunk];
+        cache[id] = !load ? Promise.resolve({{}}) : load().then(module => decode(module.default));
+    }}
+    return cache[id];
+}}
+
+export function loadChunks(locale: string, names: string[] = [CORE_CHUNK]): Promise<Messages> {{
+    return Promise.all(names.map(chunk => loadChunk(locale, chunk)))
+        .then(parts => Object.assign({{}}, ...parts));
+}}
+
+export function loadLocale(locale: string): Promise<Messages> {{
+    return loadChunks(locale, CHUNKS);
+}}
+'''
+
+_MARKER_RE = re.compile(MARKER_OPEN + r'(\d+)' + MARKER_CLOSE)
+_IMPORT_RE = re.compile(r'''\bfrom\s+['"](\.{1,2}/[^'"]+)['"]|\bimport\s*\(\s*['"](\.{1,2}/[^'"]+)['"]''')
+
+
+def _js_string(text):
+    """JSON text as a single-quoted JS string literal"""
+    escaped = text.replace('\\', '\\\\').replace("'", "\\'")
+    # Line and paragraph separators are not valid raw inside JS strings
+    return "'" + escaped.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029') + "'"
+
+
+def locale_messages(model, locale, fallback=FALLBACK_LOCALE):
+    """key -> value for one locale, filled from `fallback`"""
+    messages = model.section(locale).values()
+    base = model.section(fallback)
+    if base is not None and locale != fallback:
+        for key, value in base.values().items():
+            messages.setdefault(key, value)
+    return messages
+
+
+def locale_bundle(model, locale, fallback=FALLBACK_LOCALE):
+    """[keys, strings, refs, fragments, templates] for one locale, filled from `fallback`"""
+    return intern_bundle(locale_messages(model, locale, fallback))
+
+
+def intern_bundle(messages):
+    """[keys, strings, refs, fragments, templates] for a key -> value mapping
+
+    Every value is stored once. Long repeated blocks are factored out of the
+    whole values first, so a block holding {{slots}} is still found, and
+    each fragment is stored as its template parts. A value with {{slots}}
+    is then stored as [string index, parts] in templates, its literal parts
+    (fragment markers included) interned among the strings and its own
+    string left empty for the loader to rebuild.
+    """
+    values = list(dict.fromkeys(messages.values()))
+    factored, fragments = factor(values)
+    strings = []
+    interned = {}
+
+    def intern(value):
+        index = interned.get(value)
+        if index is None:
+            index = interned[value] = len(strings)
+            strings.append(value)
+        return index
+
+    refs = {}
+    split = []
+    for value, text in zip(values, factored):
+        if len(compile_template(value)) > 1:
+            # Taken out of the interning table so no literal part lands on it
+            refs[value] = len(strings)
+            strings.append('')
+            split.append((refs[value], text))
+        else:
+            refs[value] = intern(text)
+    templates = [[index, [part if i % 2 else intern(part) for i, part in enumerate(compile_template(text))]]
+                 for index, text in split]
+    fragments = [compile_template(block) for block in fragments]
+    return [list(messages), strings, [refs[value] for value in messages.values()], fragments, templates]
+
+
+def _join_parts(parts):
+    return ''.join('{{' + part + '}}' if i % 2 else part for i, part in enumerate(parts))
+
+
+def decode_bundle(bundle):
+    """key -> value from a bundle, the way the loader's decode() rebuilds it"""
+    keys, strings, refs, fragments, templates = bundle
+    texts = [_MARKER_RE.sub(lambda match: _join_parts(fragments[int(match.group(1))]), text) for text in strings]
+    for index, encoded in templates:
+        parts = ['']
+        for i, part in enumerate(encoded):
+            if i % 2:
+                parts += [part, '']
+                continue
+            for j, piece in enumerate(_MARKER_RE.split(strings[part])):
+                if j % 2:
+                    fragment = fragments[int(piece)]
+                    parts[-1] += fragment[0]
+                    parts.extend(fragment[1:])
+                else:
+                    parts[-1] += piece
+        texts[index] = _join_parts(parts)
+    return {key: texts[ref] for key, ref in zip(keys, refs)}
+
+
+def stored_chars(bundle):
+    """Characters of text a bundle stores, a slot counted as its {{name}}"""
+    _, strings, _, fragments, templates = bundle
+    slots = [name for _, parts in templates for name in parts[1::2]]
+    slots += [name for parts in fragments for name in parts[1::2]]
+    return (sum(len(text) for text in strings) + sum(len(name) + 4 for name in slots)
+            + sum(len(part) for parts in fragments for part in parts[::2]))
+
+
+def check_bundle(messages, bundle):
+    """Raise ValueError unless the bundle decodes to `messages` and stores no
+    more text than factoring the distinct whole values alone would"""
+    if decode_bundle(bundle) != dict(messages):
+        raise ValueError('bundle does not decode to its messages')
+    factored, fragments = factor(list(dict.fromkeys(messages.values())))
+    baseline = sum(len(text) for text in factored) + sum(len(block) for block in fragments)
+    size = stored_chars(bundle)
+    if size > baseline:
+        raise ValueError(f'bundle stores {size} characters, more than the {baseline} of its factored values')
+    return size, baseline
+
+
+def import_graph(root='.'):
+    """relative source path -> set of relative paths it imports"""
+    files = {os.path.relpath(name, root).replace(os.sep, '/') for name in source_files(root)}
+    graph = {}
+    for name in sorted(files):
+        with open(os.path.join(root, name), 'r', encoding='utf-8') as f:
+            source = f.read()
+        targets = set()
+        for match in _IMPORT_RE.finditer(source):
+            target = os.path.normpath(os.path.join(os.path.dirname(name), match.group(1) or match.group(2)))
+            target = target.replace(os.sep, '/')
+            for candidate in (target, target + '.tsx', target + '.ts', target + '/index.tsx', target + '/index.ts'):
+                if candidate in files:
+                    targets.add(candidate)
+                    break
+        graph[name] = targets
+    return graph
+
+
+def _chunk_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def route_owners(graph, entry=ENTRY_SOURCE, core=CORE_SOURCES):
+    """source path -> set of route chunks that reach it
+
+    Routes are the components the entry imports plus every service, minus
+    the core sources. A route owns only itself; any other file belongs to
+    every route it is reachable from without passing through another
+    route, and to core when no route reaches it.
+    """
+    routes = {path for path in graph.get(entry, ())
+              if path.startswith(('components/', 'services/')) and path not in core}
+    routes.update(path for path in graph if path.startswith('services/') and path not in core)
+    owners = {path: {_chunk_name(path)} for path in routes}
+    for route in sorted(routes):
+        stack = list(graph.get(route, ()))
+        seen = set()
+        while stack:
+            path = stack.pop()
+            if path in seen or path in routes or path in core:
+                continue
+            seen.add(path)
+            owners.setdefault(path, set()).add(_chunk_name(route))
+            stack.extend(graph.get(path, ()))
+    return owners
+
+
+def chunk_keys(keys, root='.', jobs=None):
+    """chunk name -> set of keys, from the key usage index and import graph"""
+    owners = route_owners(import_graph(root))
+    chunks = {CORE_CHUNK: set()}
+    for key, usages in usage_index(keys, root, jobs).items():
+        if not usages:
+            chunks.setdefault(REST_CHUNK, set()).add(key)
+            continue
+        found = set()
+        for usage in usages:
+            found.update(owners.get(usage.filename.replace(os.sep, '/'), {CORE_CHUNK}))
+        chunk = found.pop() if len(found) == 1 else CORE_CHUNK
+        chunks.setdefault(chunk, set()).add(key)
+    return chunks
+
+
+def render_module(bundle):
+    payload = json.dumps(bundle, ensure_ascii=False, separators=(',', ':'))
+    return HEADER + f'export default JSON.parse({_js_string(payload)});\n'
+
+
+def _decode_function(renderers):
+    lines = '\n'.join(f"    {json.dumps(key, ensure_ascii=False)}: {source}," for key, source in renderers.items())
+    return DECODE_FUNCTION.format(renderers=lines)
+
+
+def render_loader(locales, fallback=FALLBACK_LOCALE, renderers=None):
+    imports = '\n'.join(f"    {json.dumps(locale)}: () => import('./{locale}.js')," for locale in locales)
+    return LOADER_TEMPLATE.format(imports=imports, decode=_decode_function(renderers or {}), locales=json.dumps(locales), fallback=json.dumps(fallback))
+
+
+def render_chunked_loader(locales, chunks, fallback=FALLBACK_LOCALE, renderers=None):
+    imports = []
+    for locale in locales:
+        imports.append(f"    {json.dumps(locale)}: {{")
+        imports.extend(f"        {json.dumps(chunk)}: () => import('./{locale}/{chunk}.js')," for chunk in chunks)
+        imports.append('    },')
+    return CHUNKED_LOADER_TEMPLATE.format(imports='\n'.join(imports), decode=_decode_function(renderers or {}),
+                                          locales=json.dumps(locales),
+                                          fallback=json.dumps(fallback), chunks=json.dumps(chunks),
+                                          core=json.dumps(CORE_CHUNK))
+
+
+def _sizes(text):
+    data = text.encode('utf-8')
+    return len(data), len(gzip.compress(data, 9))
+
+
+def build(filename=TRANSLATIONS_FILE, out=OUTPUT_DIR, chunks=False):
+    """Write every bundle and the loader; returns [(name, bytes, gzip bytes, keys, strings)]"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        source = f.read()
+    model = load_translations(filename)
+    os.makedirs(out, exist_ok=True)
+
+    report = [(os.path.basename(filename), *_sizes(source), sum(len(s) for s in model.locales.values()), None)]
+    locales = list(model.locales)
+    if chunks:
+        root = os.path.dirname(os.path.abspath(filename))
+        assignment = chunk_keys({entry.key for entry in model.entries()}, root)
+        names = [CORE_CHUNK] + sorted(name for name in assignment if name != CORE_CHUNK)
+    for locale in locales:
+        messages = locale_messages(model, locale)
+        if not chunks:
+            bundle = intern_bundle(messages)
+            check_bundle(messages, bundle)
+            module = render_module(bundle)
+            write_atomic(os.path.join(out, f'{locale}.js'), module)
+            report.append((f'{locale}.js', *_sizes(module), len(bundle[0]), len(bundle[1])))
+            continue
+        os.makedirs(os.path.join(out, locale), exist_ok=True)
+        for name in names:
+            keys = assignment[name]
+            chunk_messages = {key: value for key, value in messages.items() if key in keys}
+            bundle = intern_bundle(chunk_messages)
+            check_bundle(chunk_messages, bundle)
+            module = render_module(bundle)
+            write_atomic(os.path.join(out, locale, f'{name}.js'), module)
+            report.append((f'{locale}/{name}.js', *_sizes(module), len(bundle[0]), len(bundle[1])))
+    renderers = hot_shapes(model)
+    if chunks:
+        loader = render_chunked_loader(locales, names, renderers=renderers)
+    else:
+        loader = render_loader(locales, renderers=renderers)
+    write_atomic(os.path.join(out, 'loader.ts'), loader)
+    report.append(('loader.ts', *_sizes(loader), None, None))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build per-locale translation bundles')
+    parser.add_argument('--file', default=TRANSLATIONS_FILE)
+    parser.add_argument('--out', default=OUTPUT_DIR)
+    parser.add_argument('--chunks', action='store_true', help='split each locale into route chunks')
+    args = parser.parse_args()
+
+    report = build(args.file, args.out, args.chunks)
+    print(f"{'file':<32} {'bytes':>9} {'gzip':>8} {'keys':>6} {'strings':>8}")
+    for name, size, zipped, keys, strings in report:
+        keys = '' if keys is None else keys
+        strings = '' if strings is None else strings
+        print(f"{name:<32} {size:>9} {zipped:>8} {keys:>6} {strings:>8}")
+    source_size = report[0][1]
+    if args.chunks:
+        # The first paint waits for the core chunk only
+        initial = [size for name, size, *_ in report[1:-1] if name.endswith(f'/{CORE_CHUNK}.js')]
+    else:
+        initial = [size for name, size, *_ in report[1:-1]]
+    largest = max(initial) + report[-1][1]
+    print(f"Startup payload: {source_size} → {largest} bytes at most "
+          f"({100 * (source_size - largest) / source_size:.0f}% smaller)")
+    print(f"✅ Done! Bundles written to {args.out}/")
+
+
+if __name__ == '__main__':
+    main()
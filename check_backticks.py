@@ -1,14 +1,11 @@
-with open('translations.ts', 'r', encoding='utf-8') as f:
-    content = f.read()
-    
-backtick_count = content.count('`')
-ends_with_backtick = content.rstrip().endswith('`')
+# -*- coding: utf-8 -*-
+"""
+Check translations.ts for unterminated literals and brackets.
 
-print(f"Total backticks: {backtick_count}")
-print(f"Ends with backtick: {ends_with_backtick}")
+Counting backticks went wrong whenever a template held an escaped
+backtick; this runs the structural validator in validate_translations.py.
+"""
+from validate_translations import main
 
-# Check if backtick count is even (all closed)
-if backtick_count % 2 == 0:
-    print("All backticks are properly closed")
-else:
-    print("There is an unclosed backtick")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -1,24 +1,24 @@
-with open('translations.ts', 'r', encoding='utf-8') as f:
-    content = f.read()
+# -*- coding: utf-8 -*-
+"""
+Locate unterminated template literals in translations.ts.
 
-lines = content.split('\n')
-backtick_count = 0
-unclosed_line = None
+The line where a running backtick count turns odd is rarely where the
+template opens; the structural validator reports the opening backtick
+itself.
+"""
+from translations_model import TRANSLATIONS_FILE
+from validate_translations import validate_file
 
-for i, line in enumerate(lines):
-    backticks_in_line = line.count('`')
-    backtick_count += backticks_in_line
-    
-    # If we have an odd number of backticks, we might have found the unclosed one
-    if backtick_count % 2 == 1:
-        unclosed_line = i + 1
+TEMPLATE_PROBLEMS = ('unterminated_template', 'swallowed_entries')
 
-print(f"Total backticks: {backtick_count}")
-print(f"Last line with opening backtick: {unclosed_line}")
 
-# Let's also check around the end of the file
-print("\nLast 10 lines:")
-for i in range(max(0, len(lines)-10), len(lines)):
-    backtick_count_line = lines[i].count('`')
-    if backtick_count_line > 0:
-        print(f"Line {i+1}: {backtick_count_line} backticks - {repr(lines[i])}")
\ No newline at end of file
+def main():
+    problems = [problem for problem in validate_file(TRANSLATIONS_FILE) if problem.kind in TEMPLATE_PROBLEMS]
+    for problem in problems:
+        print(f"{TRANSLATIONS_FILE}:{problem.line}:{problem.column}: {problem.message}")
+    if not problems:
+        print("All template literals are closed")
+
+
+if __name__ == '__main__':
+    main()
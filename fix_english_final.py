@@ -2,47 +2,17 @@
 """
 Fix remaining Cyrillic characters in English section
 """
+from fix_pipeline import register_rule_stage
+from rule_stages import apply_stages, load_rule_stage
 
-def read_file(filename):
-    with open(filename, 'r', encoding='utf-8') as f:
-        return f.read()
-
-def write_file(filename, content):
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(content)
+# All Cyrillic to Latin replacements in English section
+STAGE = load_rule_stage('fix_english_final')
+register_rule_stage(STAGE.name, STAGE)
 
 def main():
-    print("Reading translations.ts...")
-    content = read_file('translations.ts')
-    
-    print("Fixing English section...")
-    
-    # All Cyrillic to Latin replacements in English section
-    replacements = {
-        'Ҳello': 'Hello',
-        'Ҳow': 'How',
-        'қuestion': 'question',
-        'processinг': 'processing',
-        'reқuest': 'request',
-        'aгain': 'again',
-        'Гet': 'Get',
-        'қuick': 'quick',
-        'arcҳive': 'archive',
-        'ҳave': 'have',
-        'Upcominг': 'Upcoming',
-        'cominг': 'coming',
-        'Ҳousinг': 'Housing',
-        'ҲC': 'HC',
-    }
-    
-    for cyrillic, latin in replacements.items():
-        count = content.count(cyrillic)
-        if count > 0:
-            content = content.replace(cyrillic, latin)
-            print(f"  ✓ Replaced '{cyrillic}' → '{latin}' ({count} times)")
-    
-    print("Writing fixed file...")
-    write_file('translations.ts', content)
+    print("Fixing English section of translations.ts...")
+    counts = apply_stages([STAGE])[STAGE.name]
+    STAGE.replacer.report(counts)
     
     print("✅ Done! English section fixed.")
 
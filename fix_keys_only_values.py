@@ -2,15 +2,8 @@
 """
 Fix: Only convert values, not keys in translations.ts
 """
-import re
-
-def read_file(filename):
-    with open(filename, 'r', encoding='utf-8') as f:
-        return f.read()
-
-def write_file(filename, content):
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(content)
+from fix_pipeline import register_rule_stage
+from rule_stages import apply_stages, load_rule_stage
 
 def convert_value_to_cyrillic(value):
     """Convert only the value part to proper Cyrillic"""
@@ -25,41 +18,20 @@ def convert_value_to_cyrillic(value):
     
     return result
 
+# List of keys that were incorrectly changed (rules/fix_keys.json)
+KEY_STAGE = load_rule_stage('fix_keys')
+register_rule_stage('fix_keys_only_values', KEY_STAGE)
+
 def fix_keys(content):
     """Fix keys that were incorrectly converted"""
-    
-    # List of keys that were incorrectly changed
-    key_fixes = {
-        'view_dasҳboard': 'view_dashboard',
-        'view_investiгation': 'view_investigation',
-        'view_knowledгe': 'view_knowledge',
-        'dasҳboard_': 'dashboard_',
-        'nav_dasҳboard': 'nav_dashboard',
-        'nav_investiгation': 'nav_investigation',
-        'investiгation_': 'investigation_',
-        'prompt_investiгation': 'prompt_investigation',
-        'excel_sim_questionҳ': 'excel_sim_question',
-        'researcҳ_': 'research_',
-        'view_researcҳ': 'view_research',
-        'nav_researcҳ': 'nav_research',
-        'prompt_researcҳ': 'prompt_research',
-    }
-    
-    result = content
-    for wrong, correct in key_fixes.items():
-        result = result.replace(wrong, correct)
-    
-    return result
+    return KEY_STAGE.replacer.apply(content)[0]
 
 def main():
-    print("Reading translations.ts...")
-    content = read_file('translations.ts')
-    
-    print("Fixing incorrectly converted keys...")
-    fixed = fix_keys(content)
-    
-    print("Writing fixed file...")
-    write_file('translations.ts', fixed)
+    print("Fixing incorrectly converted keys in translations.ts...")
+    counts = apply_stages([KEY_STAGE])[KEY_STAGE.name]
+    KEY_STAGE.replacer.report(counts)
+    for conflict in KEY_STAGE.conflicts:
+        print(f"  ✗ Conflict: {conflict.key} → {conflict.new_key} already exists in {conflict.locale} (kept)")
     
     print("✅ Done! Keys restored to original English.")
 
@@ -2,30 +2,19 @@
 """
 Fix 'малумот' to 'маълумот' in uz-cyrl section
 """
+from fix_pipeline import register_rule_stage
+from rule_stages import apply_stages, load_rule_stage
 
-def read_file(filename):
-    with open(filename, 'r', encoding='utf-8') as f:
-        return f.read()
-
-def write_file(filename, content):
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(content)
+STAGE = load_rule_stage('fix_maumot')
+register_rule_stage(STAGE.name, STAGE)
 
 def main():
-    print("Reading translations.ts...")
-    content = read_file('translations.ts')
-    
-    print("Fixing 'малумот' to 'маълумот'...")
+    print("Fixing 'малумот' to 'маълумот' in translations.ts...")
     
-    # Count and replace
-    count = content.count('малумот')
-    content = content.replace('малумот', 'маълумот')
+    count = sum(apply_stages([STAGE])[STAGE.name].values())
     
     print(f"✓ Replaced {count} occurrences")
     
-    print("Writing fixed file...")
-    write_file('translations.ts', content)
-    
     print("✅ Done!")
 
 if __name__ == '__main__':
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+In-memory fix pipeline for translations.ts.
+
+Fix scripts register their work as named stages. The runner reads the
+file once, carries a single TranslationsDocument through every stage,
+times each one and writes atomically once at the end (or not at all on a
+dry run). Run it through run_fixes.py.
+"""
+import importlib
+import time
+from collections import Counter
+
+from translations_editor import write_atomic
+from translations_journal import Journal
+from translations_model import TRANSLATIONS_FILE, TranslationsSyntaxError, parse_translations
+
+# Scripts that register stages, in the order a full cleanup runs them
+STAGE_MODULES = [
+    'fix_keys_only_values',
+    'fix_all_keys',
+    'full_cyrillic_conversion',
+    'fix_maumot',
+    'fix_quote_marks',
+    'fix_english_final',
+    'fix_all_remaining_errors',
+    'homoglyph_repair',
+]
+
+STAGES = {}
+# Stages that run only when named, never as part of a full cleanup
+OPT_IN_STAGES = set()
+
+
+class TranslationsDocument:
+    """The text of translations.ts plus a parse that is redone only after edits"""
+
+    def __init__(self, text, filename=TRANSLATIONS_FILE):
+        self.filename = filename
+        self.original = text
+        self._text = text
+        self._model = None
+
+    @classmethod
+    def load(cls, filename=TRANSLATIONS_FILE):
+        with open(filename, 'r', encoding='utf-8') as f:
+            return cls(f.read(), filename)
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        if value != self._text:
+            self._text = value
+            self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = parse_translations(self._text)
+        return self._model
+
+    @property
+    def changed(self):
+        return self._text != self.original
+
+    def commit(self, editor):
+        """Apply a TranslationsEditor built against this document's model"""
+        if len(editor):
+            self.text = editor.render()
+
+    def save(self):
+        write_atomic(self.filename, self._text)
+
+
+def register_stage(name, func=None, opt_in=False):
+    """Register `func(document)` as a stage; usable as a decorator.
+
+    An opt_in stage is left out of the default run and only runs when named.
+    """
+    if func is None:
+        return lambda f: register_stage(name, f, opt_in)
+    STAGES[name] = func
+    if opt_in:
+        OPT_IN_STAGES.add(name)
+    return func
+
+
+def register_rule_stage(name, *rule_stages):
+    """Register one or more RuleStages under a single stage name"""
+    def run(document):
+        counts = Counter()
+        for stage in rule_stages:
+            editor, hits = stage.apply(document.model)
+            document.commit(editor)
+            counts.update(hits)
+        return counts
+    return register_stage(name, run)
+
+
+def load_stages():
+    """Import every script in STAGE_MODULES so its stages get registered"""
+    for module in STAGE_MODULES:
+        importlib.import_module(module)
+    return list(STAGES)
+
+
+def _change_count(result):
+    if result is None:
+        return 0
+    if isinstance(result, Counter):
+        return sum(result.values())
+    return int(result)
+
+
+def _parsed(document):
+    """The document's model, or None while its text does not parse"""
+    try:
+        return document.model
+    except TranslationsSyntaxError:
+        return None
+
+
+def run_pipeline(names=None, filename=TRANSLATIONS_FILE, dry_run=False):
+    """Run stages over one in-memory document.
+
+    Returns (document, [(stage name, seconds, changes), ...]).
+
+    A file that only parses once a stage has repaired it (fix_quote_marks)
+    is journaled from the first state that parses.
+    """
+    load_stages()
+    names = list(names) if names else [name for name in STAGES if name not in OPT_IN_STAGES]
+    unknown = [name for name in names if name not in STAGES]
+    if unknown:
+        raise KeyError(f"Unknown stage(s): {', '.join(unknown)}")
+
+    started = time.perf_counter()
+    document = TranslationsDocument.load(filename)
+    before = _parsed(document)
+    timings = [('(read + parse)', time.perf_counter() - started, 0)]
+    for name in names:
+        started = time.perf_counter()
+        result = STAGES[name](document)
+        timings.append((name, time.perf_counter() - started, _change_count(result)))
+        if before is None:
+            before = _parsed(document)
+
+    if document.changed and not dry_run:
+        after = document.model
+        document.save()
+        Journal(filename).record(before, after, 'pipeline: ' + ', '.join(names))
+    return document, timings
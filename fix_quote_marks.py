@@ -1,34 +1,117 @@
 # -*- coding: utf-8 -*-
 """
-Fix incorrect quote marks (ъ) in translations.ts
+Fix string delimiters that were transliterated into ъ/ь in translations.ts
+
+The Latin-to-Cyrillic table maps ' to ъ, so a converted entry can read
+
+    key: ъЗначениеъ,
+
+Only ъ/ь in delimiter positions are repaired: right after `key:` (the
+opening) and right before the trailing `,` of the same entry (the
+closing). The file is walked once with the lexer, so ъ and ь inside
+genuine text such as "объект" or "подъезд" are never touched.
 """
+import re
+from collections import namedtuple
+
+from fix_pipeline import TranslationsDocument, register_stage, run_pipeline
+from translations_model import TranslationsSyntaxError, iter_tokens, line_and_column
+
+Repair = namedtuple('Repair', 'line key quote')
+
+DAMAGED = 'ъь'
+QUOTES = '\'"`'
+
+# Cheap test for any candidate before lexing the whole file
+_CANDIDATE_RE = re.compile(r':[ \t]*[ъь]|[ъь][ \t]*,[ \t]*$', re.M)
+# A closing delimiter: before the trailing comma of the line, or at the
+# end of the line when the entry is the last one of its object
+_CLOSING_RE = re.compile(r'''([ъь'"`])[ \t]*,?[ \t]*(?://[^\n]*)?$''', re.M)
+_SPACE_RE = re.compile(r'[ \t]*')
 
-def read_file(filename):
-    with open(filename, 'r', encoding='utf-8') as f:
-        return f.read()
 
-def write_file(filename, content):
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(content)
+def _quote_for(body):
+    """A delimiter the literal body can sit between unchanged"""
+    for quote in QUOTES:
+        if quote == '`' or '\n' not in body:
+            if not re.search(r'(?<!\\)(?:\\\\)*' + re.escape(quote), body):
+                return quote
+    return '`'
+
+
+def repair_delimiters(text):
+    """(repaired text, [Repair]) in one lexer pass"""
+    if not _CANDIDATE_RE.search(text):
+        return text, []
+    out = []
+    repairs = []
+    done = 0
+    pos = 0
+    while True:
+        key = previous = None
+        try:
+            for token in iter_tokens(text, pos):
+                if token.kind.endswith('comment'):
+                    continue
+                if token.text == ':' and previous is not None and previous.kind in ('ident', 'string'):
+                    key = previous.text.strip('\'"')
+                    start = _SPACE_RE.match(text, token.end).end()
+                    if start < len(text) and text[start] in DAMAGED:
+                        # Only ' is ever transliterated, so the value is on one line
+                        line_end = text.find('\n', start)
+                        closing = _CLOSING_RE.search(text, start + 1, len(text) if line_end < 0 else line_end)
+                        if closing is not None:
+                            end = closing.start(1)
+                            body = text[start + 1:end]
+                            quote = text[end] if text[end] in QUOTES else _quote_for(body)
+                            out.append(text[done:start] + quote + body + quote)
+                            repairs.append(Repair(line_and_column(text, start)[0], key, quote))
+                            done = pos = end + 1
+                            break
+                previous = token
+            else:
+                break
+        except TranslationsSyntaxError as error:
+            # A real opening quote whose closing delimiter was damaged
+            start = error.offset
+            line_end = text.find('\n', start)
+            closing = _CLOSING_RE.search(text, start + 1, len(text) if line_end < 0 else line_end)
+            opens_value = text[:start].rstrip().endswith(':')
+            if not opens_value or closing is None or text[closing.start(1)] not in DAMAGED:
+                raise
+            end = closing.start(1)
+            out.append(text[done:end] + text[start])
+            repairs.append(Repair(error.line, key, text[start]))
+            done = pos = end + 1
+    out.append(text[done:])
+    return ''.join(out), repairs
+
+
+@register_stage('fix_quote_marks')
+def fix_quote_marks(document):
+    """Restore ъ/ь delimiters as quotes; other ъ/ь are left alone"""
+    text, repairs = repair_delimiters(document.text)
+    document.text = text
+    return len(repairs)
 
 def main():
     print("Reading translations.ts...")
-    content = read_file('translations.ts')
-    
+    document = TranslationsDocument.load()
+
     print("Fixing quote marks...")
-    
-    # Count occurrences
-    count = content.count('ъ')
-    print(f"Found {count} incorrect quote marks (ъ)")
-    
-    # Replace all ъ with nothing (remove them)
-    # They appear where quotes should be
-    content = content.replace('ъ', '')
-    
+    _, repairs = repair_delimiters(document.text)
+    for repair in repairs:
+        print(f"  line {repair.line}: {repair.key} → {repair.quote}")
+    print(f"Found {len(repairs)} damaged delimiters (ъ/ь)")
+    if not repairs:
+        print("✓ Nothing to change")
+        return
+
+    # Through the pipeline, so the write is atomic and journaled
     print("Writing fixed file...")
-    write_file('translations.ts', content)
-    
-    print(f"✅ Done! Removed {count} incorrect characters.")
+    run_pipeline(['fix_quote_marks'], document.filename)
+
+    print(f"✅ Done! Repaired {len(repairs)} entries.")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Factor long repeated blocks out of translation values into fragments.
+
+The prompt_* templates repeat whole instruction paragraphs (the
+"JAVOBNI FAQAT JSON formatida ..." tail, the team-of-5-AI preamble) in
+every prompt that needs them. Repeats are found with a Rabin-Karp rolling
+hash over fixed windows: every window hash is remembered with its
+position, a window whose hash was seen before is compared and extended to
+the maximal common run, and the run is snapped to whole lines. Blocks are
+then replaced longest first by a marker \\ue000<index>\\ue001, so each one
+is stored once and the loader expands it back when the bundle is decoded.
+
+Blocks may hold {{slots}}: build_i18n.py factors whole values before it
+splits templates into parts, and the loader splices a fragment's own
+parts into every template that references it.
+
+    python fragments.py [--file translations.ts]
+"""
+import argparse
+
+from translations_model import TRANSLATIONS_FILE, decode_literal, load_translations
+
+# Length of the hashed window; repeats shorter than this are never found
+WINDOW = 64
+# Blocks shorter than this are not worth a marker and a lookup
+MIN_FRAGMENT_CHARS = 96
+
+MARKER_OPEN = '\ue000'
+MARKER_CLOSE = '\ue001'
+
+_BASE = 257
+_MODULUS = (1 << 61) - 1
+
+
+def marker(index):
+    return f'{MARKER_OPEN}{index}{MARKER_CLOSE}'
+
+
+def _window_hashes(text, window):
+    """Rolling hash of every window of `text`, by start position"""
+    if len(text) < window:
+        return []
+    top = pow(_BASE, window - 1, _MODULUS)
+    value = 0
+    for char in text[:window]:
+        value = (value * _BASE + ord(char)) % _MODULUS
+    hashes = [value]
+    for pos in range(window, len(text)):
+        value = ((value - ord(text[pos - window]) * top) * _BASE + ord(text[pos])) % _MODULUS
+        hashes.append(value)
+    return hashes
+
+
+def _snap(text, start, end):
+    """Shrink text[start:end] to whole lines"""
+    if start > 0 and text[start - 1] != '\n':
+        start = text.find('\n', start, end) + 1 or end
+    if end < len(text) and text[end] != '\n':
+        end = text.rfind('\n', start, end)
+        if end < 0:
+            end = start
+    while start < end and text[start] == '\n':
+        start += 1
+    return text[start:end]
+
+
+def repeated_blocks(strings, window=WINDOW, min_chars=MIN_FRAGMENT_CHARS):
+    """Set of maximal line-aligned blocks occurring at least twice in `strings`"""
+    seen = {}
+    blocks = set()
+    for index, text in enumerate(strings):
+        hashes = _window_hashes(text, window)
+        pos = 0
+        while pos < len(hashes):
+            match = None
+            for other_index, other_pos in seen.get(hashes[pos], ()):
+                other = strings[other_index]
+                if other[other_pos:other_pos + window] == text[pos:pos + window] and (
+                        other_index != index or other_pos + window <= pos):
+                    match = other_index, other_pos
+                    break
+            if match is None:
+                seen.setdefault(hashes[pos], []).append((index, pos))
+                pos += 1
+                continue
+            other_index, other_pos = match
+            other = strings[other_index]
+            start, other_start = pos, other_pos
+            while start > 0 and other_start > 0 and text[start - 1] == other[other_start - 1]:
+                start -= 1
+                other_start -= 1
+            end, other_end = pos + window, other_pos + window
+            limit = start if other_index == index else len(other)
+            while end < len(text) and other_end < limit and text[end] == other[other_end]:
+                end += 1
+                other_end += 1
+            block = _snap(text, start, end)
+            if len(block) >= min_chars:
+                blocks.add(block)
+            next_pos = max(end - window + 1, pos + 1)
+            for skipped in range(pos, min(next_pos, len(hashes))):
+                seen.setdefault(hashes[skipped], []).append((index, skipped))
+            pos = next_pos
+    return blocks
+
+
+def factor(strings, window=WINDOW, min_chars=MIN_FRAGMENT_CHARS):
+    """(strings with markers, fragments) for a list of distinct values"""
+    fragments = []
+    for block in sorted(repeated_blocks(strings, window, min_chars), key=len, reverse=True):
+        # A longer block taken earlier may have consumed some copies
+        if sum(text.count(block) for text in strings) < 2:
+            continue
+        reference = marker(len(fragments))
+        fragments.append(block)
+        strings = [text.replace(block, reference) for text in strings]
+    return strings, fragments
+
+
+def expand(text, fragments):
+    """Inverse of factor() for one value, as the loader does it"""
+    for index, block in enumerate(fragments):
+        text = text.replace(marker(index), block)
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report repeated blocks that fragments would factor out')
+    parser.add_argument('--file', default=TRANSLATIONS_FILE)
+    args = parser.parse_args()
+
+    model = load_translations(args.file)
+    for locale, section in model.locales.items():
+        strings = list(dict.fromkeys(decode_literal(entry.raw) for entry in section.by_key.values()))
+        factored, fragments = factor(strings)
+        before = sum(len(text) for text in strings)
+        after = sum(len(text) for text in factored) + sum(len(block) for block in fragments)
+        print(f"{locale:<8} {len(fragments):>3} fragments  {before:>7} → {after:>7} characters")
+        for block in fragments:
+            print(f"    {len(block):>5}  {block[:60]!r}")
+
+
+if __name__ == '__main__':
+    main()
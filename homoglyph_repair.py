@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Dictionary-driven repair of mixed-script tokens in translations.ts.
+
+Word dictionaries are hashed sets built from the parts of the file that
+are known to be clean: Latin words from the English section and the key
+identifiers. The other locales are what is being repaired, so their
+tokens never become dictionary words; a Cyrillic dictionary can be passed
+to repair() once a clean source for one exists. Each token found by
+mixed_script is folded through a homoglyph table towards Latin and
+towards Cyrillic, and the folded spellings are looked up in O(1). A token
+with exactly one dictionary hit is fixed; several hits are reported as
+ambiguous and no hit as unresolved, never guessed. A single hit is also
+reported as ambiguous unless its script is the one that clearly
+dominates the value it sits in.
+
+The stage is opt-in: run_fixes.py runs it only when named, until the
+ambiguous cases have been reviewed.
+
+    python homoglyph_repair.py [--dry-run]
+"""
+import argparse
+import re
+from collections import namedtuple
+from itertools import product
+
+from fix_pipeline import register_stage
+from mixed_script import classify, detect
+from translations_editor import TranslationsEditor
+from translations_journal import Journal
+from translations_model import TRANSLATIONS_FILE, load_translations
+
+Repair = namedtuple('Repair', 'locale key line token candidates')
+
+# Cyrillic letter -> Latin spellings it was produced from or looks like
+TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v b', 'г': 'g', 'ғ': 'g', 'д': 'd', 'е': 'e',
+    'ё': 'yo', 'ж': 'j', 'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'қ': 'q',
+    'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'p r', 'с': 'c s',
+    'т': 't', 'у': 'u y', 'ў': "o'", 'ф': 'f', 'х': 'x h', 'ҳ': 'h',
+    'ц': 'ts c', 'ч': 'ch', 'ш': 'sh', 'ъ': "'", 'э': 'e', 'ю': 'yu', 'я': 'ya',
+}
+# Latin letter -> Cyrillic letters it was produced from or looks like
+TO_CYRILLIC = {
+    'a': 'а', 'b': 'б в', 'c': 'с ц', 'd': 'д', 'e': 'е э', 'f': 'ф',
+    'g': 'г ғ', 'h': 'ҳ х', 'i': 'и', 'j': 'ж', 'k': 'к', 'l': 'л', 'm': 'м',
+    'n': 'н', 'o': 'о ў', 'p': 'п р', 'q': 'қ', 'r': 'р', 's': 'с', 't': 'т',
+    'u': 'у', 'v': 'в', 'x': 'х', 'y': 'й у', 'z': 'з',
+}
+# The section whose words are trusted as a dictionary
+CLEAN_LOCALE = 'en'
+# Keep the candidate set per token small and the lookup cost bounded
+MAX_CANDIDATES = 256
+
+_WORD_RE = re.compile(r'[^\W\d_]+')
+_LATIN_WORD_RE = re.compile(r'^[A-Za-z]+$')
+_CYRILLIC_WORD_RE = re.compile(r'^[Ѐ-ԯ]+$')
+
+
+def build_dictionaries(model, clean_locale=CLEAN_LOCALE):
+    """(latin_words, cyrillic_words) as lowercase sets, from clean sources only"""
+    latin = set()
+    for entry in model.entries():
+        latin.update(part.lower() for part in entry.key.split('_') if _LATIN_WORD_RE.match(part))
+        if entry.locale != clean_locale:
+            continue
+        for word in _WORD_RE.findall(entry.value):
+            if len(word) >= 2 and _LATIN_WORD_RE.match(word):
+                latin.add(word.lower())
+    return latin, set()
+
+
+def _fold(token, table, keep_re):
+    """Every spelling of `token` with the other script's letters folded"""
+    options = []
+    total = 1
+    for ch in token.lower():
+        if keep_re.match(ch):
+            options.append((ch,))
+            continue
+        choices = table.get(ch)
+        if choices is None:
+            return []
+        options.append(tuple(choices.split(' ')))
+        total *= len(options[-1])
+        if total > MAX_CANDIDATES:
+            return []
+    return [''.join(parts) for parts in product(*options)]
+
+
+def _restore_case(token, word):
+    """Apply the letter case of `token` to `word`"""
+    if token.isupper():
+        return word.upper()
+    if len(word) == len(token):
+        return ''.join(w.upper() if t.isupper() else w for t, w in zip(token, word))
+    if token[:1].isupper():
+        return word[:1].upper() + word[1:]
+    return word
+
+
+def candidates(token, latin, cyrillic):
+    """Dictionary words `token` could have been before it was corrupted"""
+    hits = {word for word in _fold(token, TO_LATIN, _LATIN_WORD_RE) if word in latin}
+    hits.update(word for word in _fold(token, TO_CYRILLIC, _CYRILLIC_WORD_RE) if word in cyrillic)
+    return sorted(_restore_case(token, word) for word in hits)
+
+
+def line_script(line):
+    """'L' or 'C' when one script clearly dominates a line, else None"""
+    classes = classify(line)
+    latin, cyrillic = classes.count('L'), classes.count('C')
+    if latin > 2 * cyrillic:
+        return 'L'
+    if cyrillic > 2 * latin:
+        return 'C'
+    return None
+
+
+def repair(model, editor=None, dictionaries=None):
+    """Record fixes for every unambiguous token in values.
+
+    Returns (editor, fixed, ambiguous, unresolved) where the last three are
+    lists of Repair.
+    """
+    if editor is None:
+        editor = TranslationsEditor(model)
+    latin, cyrillic = dictionaries or build_dictionaries(model)
+    fixed, ambiguous, unresolved = [], [], []
+    per_entry = {}
+    cache = {}
+    for token in detect(model):
+        if token.where != 'value':
+            continue
+        if token.text not in cache:
+            cache[token.text] = candidates(token.text, latin, cyrillic)
+        found = cache[token.text]
+        report = Repair(token.locale, token.key, token.line, token.text, found)
+        entry = _entry_at(model, token.offset)
+        # A single hit is trusted only in the script its value is written in
+        # ('Wорд' in a Cyrillic value is not 'Word')
+        context = line_script(entry.value)
+        if len(found) == 1 and (context is None or classify(found[0]).count(context) == 0):
+            ambiguous.append(report)
+        elif len(found) == 1:
+            fixed.append(report)
+            per_entry.setdefault(entry, []).append((token.offset, token.text, found[0]))
+        elif found:
+            ambiguous.append(report)
+        else:
+            unresolved.append(report)
+
+    for entry, fixes in per_entry.items():
+        # Splice into the entry the tokens were found in, which may be an
+        # earlier duplicate of its key
+        base = entry.value_span[0] + 1
+        raw = entry.raw
+        for offset, old, new in sorted(fixes, reverse=True):
+            start = offset - base
+            raw = raw[:start] + new + raw[start + len(old):]
+        editor.set_entry_raw(entry, raw)
+    return editor, fixed, ambiguous, unresolved
+
+
+def _entry_at(model, offset):
+    """The entry whose literal holds `offset`, duplicates included"""
+    for section in model.sections:
+        if section.body_span[0] <= offset < section.body_span[1]:
+            for entry in section.entries:
+                if entry.value_span[0] <= offset < entry.value_span[1]:
+                    return entry
+    raise ValueError(f'Offset {offset} is outside every value')
+
+
+@register_stage('homoglyph_repair', opt_in=True)
+def homoglyph_repair(document):
+    editor, fixed, _, _ = repair(document.model)
+    document.commit(editor)
+    return len(fixed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Repair mixed Latin/Cyrillic tokens from the file\'s own dictionaries')
+    parser.add_argument('--file', default=TRANSLATIONS_FILE)
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    model = load_translations(args.file)
+    editor, fixed, ambiguous, unresolved = repair(model)
+    for item in fixed:
+        print(f"  ✓ {item.locale}.{item.key}: '{item.token}' → '{item.candidates[0]}'")
+    for item in ambiguous:
+        print(f"  ? {item.locale}.{item.key} (line {item.line}): '{item.token}' could be {', '.join(item.candidates)}")
+    for item in unresolved:
+        print(f"  ✗ {item.locale}.{item.key} (line {item.line}): '{item.token}' has no dictionary match")
+    print(f"{len(fixed)} fixed, {len(ambiguous)} ambiguous, {len(unresolved)} unresolved")
+
+    if args.dry_run or not len(editor):
+        return
+    editor.save(args.file)
+    Journal(args.file).record(model, load_translations(args.file), 'homoglyph_repair')
+    print("✅ Done!")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Key usage index: which translation keys the TS/TSX sources reference.
+
+Every source file is scanned independently, in a pool of worker processes
+once the tree is large enough to pay for it (or with --jobs), for:
+
+  call      t('key') with a literal key
+  literal   any other string literal equal to a key, which covers keys kept
+            in variables and ternaries (promptKey = x ? 'a' : 'b') and in
+            config objects such as { labelKey: 'nav_dashboard' }
+  template  a template literal such as `court_stage_${stage}`, matched
+            against every key as a pattern
+
+The result is a key -> [Usage] index; keys with no usage are reported as
+unused so they can be pruned from the bundles.
+
+    python key_usage.py [--file translations.ts] [--jobs N] [--json]
+"""
+import argparse
+import bisect
+import json
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from translations_model import TRANSLATIONS_FILE, load_translations
+
+Usage = namedtuple('Usage', 'key kind filename line')
+
+SOURCE_EXTENSIONS = ('.ts', '.tsx')
+SKIP_DIRS = {'node_modules', 'dist', 'build', 'i18n', '.git'}
+# Below this many files the worker pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+_CALL_RE = re.compile(r'''\bt\(\s*(['"])(\w+)\1''')
+_STRING_RE = re.compile(r'''(['"])(\w+)\1''')
+_TEMPLATE_RE = re.compile(r'`((?:[^`\\]|\\.)*)`', re.S)
+_INTERPOLATION_RE = re.compile(r'\$\{[^{}]*\}')
+# A template is a key pattern when its static text looks like a key part
+_KEY_PART_RE = re.compile(r'^[A-Za-z0-9_]*$')
+_KEY_WORD_RE = re.compile(r'[A-Za-z][A-Za-z0-9]*_|_[A-Za-z]')
+
+
+def source_files(root='.'):
+    """Every TS/TSX file under `root` except translations and build output"""
+    found = []
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith('.'))
+        for name in sorted(files):
+            if name.endswith(SOURCE_EXTENSIONS) and not name.startswith('translations'):
+                found.append(os.path.join(directory, name))
+    return found
+
+
+def _line_starts(source):
+    return [0] + [match.end() for match in re.finditer('\n', source)]
+
+
+def scan_file(filename):
+    """(filename, [(text, kind, line)], [(prefix, pattern, line)]) for one file"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        source = f.read()
+    starts = _line_starts(source)
+
+    def line(offset):
+        return bisect.bisect_right(starts, offset)
+
+    calls = {match.start(2) for match in _CALL_RE.finditer(source)}
+    literals = [(match.group(2), 'call' if match.start(2) in calls else 'literal', line(match.start()))
+                for match in _STRING_RE.finditer(source)]
+
+    templates = []
+    for match in _TEMPLATE_RE.finditer(source):
+        body = match.group(1)
+        parts = _INTERPOLATION_RE.split(body)
+        if len(parts) < 2 or not all(_KEY_PART_RE.match(part) for part in parts):
+            continue
+        if not _KEY_WORD_RE.search(''.join(parts)):
+            continue
+        pattern = r'\w*'.join(re.escape(part) for part in parts)
+        templates.append((parts[0], pattern, line(match.start())))
+    return filename, literals, templates
+
+
+def _scan_all(files, jobs):
+    if jobs == 1 or (jobs is None and len(files) < PARALLEL_THRESHOLD):
+        return [scan_file(filename) for filename in files]
+    workers = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(scan_file, files, chunksize=max(1, len(files) // (4 * workers))))
+
+
+def usage_index(keys, root='.', jobs=None):
+    """key -> [Usage] for every key in `keys` (unused keys map to [])"""
+    keys = sorted(set(keys))
+    key_set = set(keys)
+    index = {key: [] for key in keys}
+    for filename, literals, templates in _scan_all(source_files(root), jobs):
+        relative = os.path.relpath(filename, root)
+        for text, kind, line in literals:
+            if text in key_set:
+                index[text].append(Usage(text, kind, relative, line))
+        for prefix, pattern, line in templates:
+            compiled = re.compile(pattern)
+            # Only keys sharing the template's static prefix can match
+            start = bisect.bisect_left(keys, prefix)
+            for key in keys[start:]:
+                if not key.startswith(prefix):
+                    break
+                if compiled.fullmatch(key):
+                    index[key].append(Usage(key, 'template', relative, line))
+    return index
+
+
+def unused_keys(model, root='.', jobs=None):
+    """(index, sorted unused keys) for every key of every locale"""
+    keys = {entry.key for entry in model.entries()}
+    index = usage_index(keys, root, jobs)
+    return index, sorted(key for key, usages in index.items() if not usages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index translation key usage and report unused keys')
+    parser.add_argument('--file', default=TRANSLATIONS_FILE)
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (1 = no pool)')
+    parser.add_argument('--json', action='store_true', help='print the whole index as JSON')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    model = load_translations(args.file)
+    root = os.path.dirname(os.path.abspath(args.file))
+    index, unused = unused_keys(model, root, args.jobs)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps({key: [usage._asdict() for usage in usages] for key, usages in index.items()},
+                         ensure_ascii=False, indent=2))
+        return
+    wasted = 0
+    for key in unused:
+        lines = []
+        for section in model.sections:
+            entry = section.by_key.get(key)
+            if entry is not None:
+                lines.append(f"{section.locale}:{entry.line}")
+                wasted += len(entry.raw.encode('utf-8'))
+        print(f"  {key:<48} {' '.join(lines)}")
+    print(f"{len(unused)} of {len(index)} keys unused ({wasted} bytes of values) in {elapsed * 1000:.0f} ms")
+    sys.exit(1 if unused else 0)
+
+
+if __name__ == '__main__':
+    main()
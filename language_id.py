@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Character-trigram language identifier for translation values.
+
+A small model for uz-cyrl, uz-latn, ru and en is built from the seed text
+below (no network model, no extra dependencies). The values of a batch
+form one sparse value x trigram count matrix, kept by column; scoring the
+batch is its product with the sparse trigram x language table, which holds
+each seed trigram's gain over the unseen log-probability. Every distinct
+trigram of the batch is looked up once and its gain row added to every
+value holding it, so a trigram shared by hundreds of values costs one
+lookup.
+
+Values whose detected language differs from their section by a clear
+margin are listed. Escapes, placeholders, ${} and identifiers are
+ignored, and values too short to judge are skipped.
+
+    python language_id.py [--file translations.ts] [--json]
+"""
+import argparse
+import json
+import math
+import re
+import sys
+from collections import Counter, namedtuple
+
+from translations_model import TRANSLATIONS_FILE, decode_literal, load_translations, protected_spans
+from replacement_engine import unprotected_spans
+
+Detection = namedtuple('Detection', 'locale key line detected margin value')
+
+SEED_TEXT = {
+    'uz-cyrl': (
+        "Ушбу иш бўйича суд қарори чиқарилди. Ҳужжатларни юклаб олинг ва таҳлил қилинг. "
+        "Мижознинг ҳуқуқлари ва мажбуриятлари ҳақида маълумот беринг. Далилларни кўриб "
+        "чиқиш учун тугмани босинг. Адвокат учун стратегия тайёрланмоқда, илтимос кутинг. "
+        "Гувоҳларни сўроқ қилиш режасини тузинг. Иш материаллари, вазифалар ва муддатлар "
+        "рўйхати. Янги иш қўшиш, таҳрирлаш ва ўчириш. Ғалаба эҳтимоли, хавфлар ва асосий "
+        "омиллар. Қонун моддаси бўйича қисқача изоҳ. Сизнинг шахсий кабинетингиз. Ёзувни "
+        "тўхтатиш ва сақлаш. Ҳеч қандай маълумот топилмади. Жавобгар, даъвогар ва "
+        "судланувчи. Бу ерда ишнинг барча тафсилотлари кўрсатилган. Якуний стратегия ва "
+        "билимлар базаси. Мажлисга тайёргарлик кўринг ва саволларни олдиндан ёзиб қўйинг."
+    ),
+    'uz-latn': (
+        "Ushbu ish bo'yicha sud qarori chiqarildi. Hujjatlarni yuklab oling va tahlil qiling. "
+        "Mijozning huquqlari va majburiyatlari haqida ma'lumot bering. Dalillarni ko'rib "
+        "chiqish uchun tugmani bosing. Advokat uchun strategiya tayyorlanmoqda, iltimos kuting. "
+        "Guvohlarni so'roq qilish rejasini tuzing. Ish materiallari, vazifalar va muddatlar "
+        "ro'yxati. Yangi ish qo'shish, tahrirlash va o'chirish. G'alaba ehtimoli, xavflar va "
+        "asosiy omillar. Qonun moddasi bo'yicha qisqacha izoh. Sizning shaxsiy kabinetingiz. "
+        "Yozuvni to'xtatish va saqlash. Hech qanday ma'lumot topilmadi. Javobgar, da'vogar va "
+        "sudlanuvchi. Bu yerda ishning barcha tafsilotlari ko'rsatilgan. Yakuniy strategiya va "
+        "bilimlar bazasi. Majlisga tayyorgarlik ko'ring va savollarni oldindan yozib qo'ying."
+    ),
+    'ru': (
+        "По данному делу вынесено решение суда. Загрузите документы и проанализируйте их. "
+        "Предоставьте информацию о правах и обязанностях клиента. Нажмите кнопку, чтобы "
+        "просмотреть доказательства. Стратегия для адвоката готовится, пожалуйста, подождите. "
+        "Составьте план допроса свидетелей. Материалы дела, список задач и сроков. Добавить "
+        "новое дело, редактировать и удалить. Вероятность победы, риски и основные факторы. "
+        "Краткий комментарий к статье закона. Ваш личный кабинет. Остановить запись и "
+        "сохранить. Никакой информации не найдено. Ответчик, истец и подсудимый. Здесь "
+        "показаны все подробности дела. Итоговая стратегия и база знаний. Подготовьтесь к "
+        "заседанию и заранее запишите вопросы."
+    ),
+    'en': (
+        "A court decision has been issued in this case. Upload the documents and analyze them. "
+        "Provide information about the rights and obligations of the client. Click the button "
+        "to review the evidence. The strategy for the lawyer is being prepared, please wait. "
+        "Create a plan for questioning the witnesses. Case materials, list of tasks and "
+        "deadlines. Add a new case, edit and delete. Probability of winning, risks and key "
+        "factors. Brief commentary on the article of the law. Your personal account. Stop "
+        "recording and save. No information found. Defendant, plaintiff and accused. All the "
+        "details of the case are shown here. Final strategy and knowledge base. Prepare for "
+        "the hearing and write down your questions in advance."
+    ),
+}
+LANGUAGES = tuple(SEED_TEXT)
+
+# Values with fewer trigrams than this are too short to judge
+MIN_TRIGRAMS = 12
+# Average log-probability advantage per trigram needed to flag a value
+MIN_MARGIN = 0.4
+SMOOTHING = 0.5
+
+_APOSTROPHES = str.maketrans({'ʻ': "'", 'ʼ': "'", '’': "'", '‘': "'", '`': "'"})
+_NON_LETTER_RE = re.compile(r"[^\w']+|[\d_]+")
+
+
+def normalize(text):
+    """Lowercase letters and apostrophes, single spaces, padded for trigrams"""
+    words = _NON_LETTER_RE.sub(' ', text.translate(_APOSTROPHES).lower()).split()
+    return ' ' + ' '.join(words) + ' ' if words else ''
+
+
+def trigrams(text):
+    """Sparse trigram count vector of normalized text"""
+    return Counter(text[i:i + 3] for i in range(len(text) - 2))
+
+
+class LanguageModel:
+    """Per-language trigram log-probabilities with additive smoothing"""
+
+    def __init__(self, seed_text=SEED_TEXT, smoothing=SMOOTHING):
+        self.languages = tuple(seed_text)
+        counts = {lang: trigrams(normalize(text)) for lang, text in seed_text.items()}
+        vocabulary = set()
+        for vector in counts.values():
+            vocabulary.update(vector)
+        size = len(vocabulary) + 1
+        unseen = []
+        log_probs = {}
+        for lang in self.languages:
+            total = sum(counts[lang].values()) + smoothing * size
+            log_probs[lang] = {tri: math.log((n + smoothing) / total) for tri, n in counts[lang].items()}
+            unseen.append(math.log(smoothing / total))
+        self._unseen = tuple(unseen)
+        # Sparse trigram x language matrix: only trigrams seen in some seed
+        # text get a row, holding the gain over the unseen log-probability
+        self._rows = {
+            tri: tuple(log_probs[lang].get(tri, base) - base for lang, base in zip(self.languages, unseen))
+            for tri in vocabulary
+        }
+
+    def score_many(self, texts):
+        """(scores per language, trigram count) for each text, in order"""
+        # Value x trigram counts by column: trigram -> ([value], [count])
+        columns = {}
+        sizes = []
+        for index, text in enumerate(texts):
+            vector = trigrams(normalize(text))
+            sizes.append(sum(vector.values()))
+            for tri, count in vector.items():
+                column = columns.get(tri)
+                if column is None:
+                    column = columns[tri] = ([], [])
+                column[0].append(index)
+                column[1].append(count)
+        scores = [[size * base for base in self._unseen] for size in sizes]
+        rows = self._rows
+        for tri, (indices, counts) in columns.items():
+            gains = rows.get(tri)
+            if gains is None:
+                continue
+            for index, count in zip(indices, counts):
+                row = scores[index]
+                for i, gain in enumerate(gains):
+                    row[i] += count * gain
+        return list(zip(scores, sizes))
+
+    def detect(self, text):
+        """Most likely language of one text"""
+        (scores, _), = self.score_many([text])
+        return self.languages[scores.index(max(scores))]
+
+
+def _prose(raw):
+    """Cooked value with escapes, placeholders, ${} and identifiers removed"""
+    spans = protected_spans(raw)
+    if spans:
+        raw = ' '.join(raw[start:end] for start, end in unprotected_spans(raw, spans))
+    return decode_literal(raw)
+
+
+def misplaced(model, language_model=None, min_margin=MIN_MARGIN):
+    """Detections for values whose language does not match their section"""
+    language_model = language_model or LanguageModel()
+    languages = language_model.languages
+    entries = [entry for entry in model.entries() if entry.locale in languages]
+    texts = [_prose(entry.raw) for entry in entries]
+    found = []
+    for entry, text, (scores, size) in zip(entries, texts, language_model.score_many(texts)):
+        if size < MIN_TRIGRAMS:
+            continue
+        best = scores.index(max(scores))
+        expected = languages.index(entry.locale)
+        margin = (scores[best] - scores[expected]) / size
+        if best != expected and margin >= min_margin:
+            found.append(Detection(entry.locale, entry.key, entry.line, languages[best],
+                                   round(margin, 2), text))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find values written in a different language than their section')
+    parser.add_argument('--file', default=TRANSLATIONS_FILE)
+    parser.add_argument('--margin', type=float, default=MIN_MARGIN,
+                        help='per-trigram log-probability advantage needed to report a value')
+    parser.add_argument('--json', action='store_true', help='print machine-readable output')
+    args = parser.parse_args()
+
+    found = misplaced(load_translations(args.file), min_margin=args.margin)
+    if args.json:
+        print(json.dumps([item._asdict() for item in found], ensure_ascii=False, indent=2))
+    else:
+        for item in found:
+            print(f"{args.file}:{item.line}: {item.locale}.{item.key} looks like {item.detected}"
+                  f" (+{item.margin}): {item.value[:60]!r}")
+        print(f"{len(found)} values in the wrong language")
+    sys.exit(1 if found else 0)
+
+
+if __name__ == '__main__':
+    main()
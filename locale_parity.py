@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Locale parity report for translations.ts.
+
+App.tsx's t() falls back from translations[language][key] to
+translations['en'][key], so a key missing from one locale goes unnoticed
+and a key missing from en is not rendered at all. From a single parse
+this reports, with line numbers:
+
+  missing          key in the reference locale (en) but not in this locale
+  extra            key in this locale but not in the reference locale
+  duplicate_key    key defined twice in one locale block (the last wins)
+  duplicate_locale a whole locale block defined twice (the last wins)
+
+Every comparison is a set difference between hashed key sets, so the
+report is linear in the number of keys times the number of locales.
+
+    python locale_parity.py [--file translations.ts] [--reference en] [--json]
+"""
+import argparse
+import json
+import sys
+from collections import namedtuple
+
+from translations_model import TRANSLATIONS_FILE, TranslationsSyntaxError, load_translations
+
+ParityIssue = namedtuple('ParityIssue', 'kind locale key line other_line')
+
+REFERENCE_LOCALE = 'en'
+
+
+def parity(model, reference=REFERENCE_LOCALE, keys=None):
+    """List of ParityIssue for a parsed file, in file order
+
+    With `keys` only issues about those keys are reported (and no
+    duplicate_locale issues), which is what an incremental re-check needs.
+    """
+    issues = []
+    for locale, sections in model.duplicate_locales.items():
+        if keys is not None:
+            break
+        first = sections[0]
+        for section in sections[1:]:
+            issues.append(ParityIssue('duplicate_locale', locale, None, section.line, first.line))
+
+    for section in model.sections:
+        if not section.duplicates:
+            continue
+        first_line = {}
+        for entry in section.entries:
+            first_line.setdefault(entry.key, entry.line)
+        for entry in section.duplicates:
+            if keys is not None and entry.key not in keys:
+                continue
+            issues.append(ParityIssue('duplicate_key', section.locale, entry.key, entry.line, first_line[entry.key]))
+
+    # Object literal semantics: the last block of a locale is the one used
+    base = model.section(reference)
+    if base is not None:
+        base_keys = base.by_key.keys()
+        for locale, section in model.locales.items():
+            if locale == reference:
+                continue
+            section_keys = section.by_key.keys()
+            if keys is None:
+                missing, extra = base_keys - section_keys, section_keys - base_keys
+            else:
+                missing = [key for key in keys if key in base_keys and key not in section_keys]
+                extra = [key for key in keys if key in section_keys and key not in base_keys]
+            for key in missing:
+                issues.append(ParityIssue('missing', locale, key, section.line, base[key].line))
+            for key in extra:
+                issues.append(ParityIssue('extra', locale, key, section[key].line, None))
+
+    issues.sort(key=lambda issue: (issue.line, issue.other_line or 0, issue.kind))
+    return issues
+
+
+def _describe(issue, reference):
+    if issue.kind == 'duplicate_locale':
+        return f"'{issue.locale}' block defined again (first at line {issue.other_line})"
+    if issue.kind == 'duplicate_key':
+        return f"{issue.locale}.{issue.key} defined again (first at line {issue.other_line})"
+    if issue.kind == 'missing':
+        return f"{issue.locale} is missing {issue.key} ({reference} line {issue.other_line})"
+    return f"{issue.locale}.{issue.key} is not in {reference}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare key sets across locales')
+    parser.add_argument('--file', default=TRANSLATIONS_FILE)
+    parser.add_argument('--reference', default=REFERENCE_LOCALE, help='locale the others are compared with')
+    parser.add_argument('--tolerant', action='store_true', help='accept damaged files such as old backups')
+    parser.add_argument('--json', action='store_true', help='print machine-readable output')
+    args = parser.parse_args()
+
+    try:
+        model = load_translations(args.file, strict=not args.tolerant)
+    except TranslationsSyntaxError as error:
+        print(f"{args.file}:{error.line}:{error.column}: syntax: {error.message}"
+              f" (see validate_translations.py, or pass --tolerant)")
+        sys.exit(1)
+    if model.section(args.reference) is None:
+        parser.error(f"no '{args.reference}' section in {args.file}")
+    issues = parity(model, args.reference)
+
+    if args.json:
+        print(json.dumps([issue._asdict() for issue in issues], ensure_ascii=False, indent=2))
+    else:
+        for issue in issues:
+            print(f"{args.file}:{issue.line}: {_describe(issue, args.reference)}")
+        counts = {}
+        for issue in issues:
+            counts[issue.kind] = counts.get(issue.kind, 0) + 1
+        summary = ', '.join(f"{count} {kind}" for kind, count in sorted(counts.items()))
+        print(f"{len(issues)} parity issues" + (f" ({summary})" if summary else ''))
+    sys.exit(1 if issues else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Detect tokens that mix Latin and Cyrillic letters (homoglyph corruption)
+such as 'Dasҳboard', 'strateгy' or 'қuestion'.
+
+Every codepoint of the file is classified by script in one pass through
+str.translate with a precomputed lookup table (L = Latin letter,
+C = Cyrillic letter, w = any other word character). A single regex over
+that class string then finds the tokens containing both L and C, and each
+hit is mapped back to its locale, key and offset through the parsed model.
+
+    python mixed_script.py [translations.ts] [--json]
+"""
+import argparse
+import bisect
+import json
+import re
+import sys
+from collections import namedtuple
+
+from translations_model import TRANSLATIONS_FILE, load_translations
+
+MixedToken = namedtuple('MixedToken', 'offset line text locale key where')
+
+_LATIN_RANGES = ((0x41, 0x5A), (0x61, 0x7A), (0xC0, 0x24F), (0x1E00, 0x1EFF))
+_CYRILLIC_RANGES = ((0x400, 0x52F), (0x1C80, 0x1C8F), (0x2DE0, 0x2DFF), (0xA640, 0xA69F))
+_MIXED_RE = re.compile(r'(?<![LCw])(?=[Cw]*L)(?=[Lw]*C)[LCw]+')
+
+_SCRIPT_TABLE = None
+
+
+def script_table():
+    """codepoint -> 'L' / 'C' / 'w' for every BMP word character"""
+    global _SCRIPT_TABLE
+    if _SCRIPT_TABLE is None:
+        table = {}
+        for cp in range(0x10000):
+            ch = chr(cp)
+            if ch.isalnum() or ch == '_':
+                table[cp] = 'w'
+        for ranges, cls in ((_LATIN_RANGES, 'L'), (_CYRILLIC_RANGES, 'C')):
+            for low, high in ranges:
+                for cp in range(low, high + 1):
+                    if chr(cp).isalpha():
+                        table[cp] = cls
+        _SCRIPT_TABLE = table
+    return _SCRIPT_TABLE
+
+
+def classify(text):
+    """Class string of `text`, one class character per codepoint"""
+    return text.translate(script_table())
+
+
+def find_mixed_spans(text):
+    """(start, end) of every token that mixes Latin and Cyrillic letters"""
+    return [match.span() for match in _MIXED_RE.finditer(classify(text))]
+
+
+def _entry_index(model):
+    """Sorted (start, end, entry) spans covering each key and value"""
+    spans = []
+    for entry in model.entries():
+        spans.append((entry.key_span[0], entry.key_span[1], entry, 'key'))
+        spans.append((entry.value_span[0], entry.value_span[1], entry, 'value'))
+    spans.sort(key=lambda span: span[0])
+    return spans
+
+
+def detect(model, keys=None):
+    """Every mixed-script token of a parsed file, in file order
+
+    With `keys` only the keys and values of those entries are scanned.
+    """
+    text = model.text
+    if keys is not None:
+        tokens = []
+        for entry in model.entries():
+            if entry.key not in keys:
+                continue
+            for (start, end), where in ((entry.key_span, 'key'), (entry.value_span, 'value')):
+                for span_start, span_end in find_mixed_spans(text[start:end]):
+                    offset = start + span_start
+                    tokens.append(MixedToken(offset, model.line_of(offset), text[offset:start + span_end],
+                                             entry.locale, entry.key, where))
+        return tokens
+    index = _entry_index(model)
+    starts = [span[0] for span in index]
+    tokens = []
+    for start, end in find_mixed_spans(text):
+        i = bisect.bisect_right(starts, start) - 1
+        locale = key = None
+        where = 'code'
+        if i >= 0 and start < index[i][1]:
+            entry = index[i][2]
+            locale, key, where = entry.locale, entry.key, index[i][3]
+        elif model.comments:
+            j = bisect.bisect_right(model.comments, (start, len(text))) - 1
+            if j >= 0 and start < model.comments[j][1]:
+                where = 'comment'
+        tokens.append(MixedToken(start, model.line_of(start), text[start:end], locale, key, where))
+    return tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find tokens that mix Latin and Cyrillic letters')
+    parser.add_argument('file', nargs='?', default=TRANSLATIONS_FILE)
+    parser.add_argument('--json', action='store_true', help='print machine-readable output')
+    args = parser.parse_args()
+
+    tokens = detect(load_translations(args.file))
+    if args.json:
+        print(json.dumps([token._asdict() for token in tokens], ensure_ascii=False, indent=2))
+    else:
+        for token in tokens:
+            location = f"{token.locale}.{token.key} ({token.where})" if token.key else token.where
+            print(f"{args.file}:{token.line}: {token.text!r} in {location}")
+        print(f"{len(tokens)} mixed-script tokens")
+    sys.exit(1 if tokens else 0)
+
+
+if __name__ == '__main__':
+    main()
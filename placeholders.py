@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Cross-locale {{placeholder}} consistency for translations.ts.
+
+The index maps locale -> key -> frozenset of placeholder names and is
+built in one pass over the parsed entries, so it is cheap enough to run
+after every pipeline write. Two kinds of issue are reported:
+
+  mismatch    a key whose placeholder set differs from the en section
+              (a corrupted {{артиcле}} in uz-cyrl next to {{article}} in en)
+  unsupplied  a placeholder that a t('key', {...}) call in App.tsx,
+              services/ or components/ never passes, so it would reach the
+              user or the model unrendered
+
+    python placeholders.py [--file translations.ts] [--json]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+from translations_model import (TRANSLATIONS_FILE, TranslationsSyntaxError, decode_literal,
+                                iter_tokens, line_and_column, load_translations)
+
+PlaceholderIssue = namedtuple('PlaceholderIssue', 'kind locale key line expected found where')
+CallSite = namedtuple('CallSite', 'key params filename line')
+
+REFERENCE_LOCALE = 'en'
+# Code that calls t(); relative to the directory of translations.ts
+SOURCE_PATHS = ('App.tsx', 'services', 'components')
+SOURCE_EXTENSIONS = ('.ts', '.tsx')
+
+_PLACEHOLDER_RE = re.compile(r'\{\{\s*([^{}]*?)\s*\}\}')
+# t('key', { ... }) or t(name, { ... }) where name holds the key
+_CALL_RE = re.compile(r'''\bt\(\s*(?:(['"])(\w+)\1|([A-Za-z_$][\w$]*))\s*,\s*\{''')
+_KEY_LITERAL_RE = re.compile(r'''(['"])(\w+)\1''')
+_OPENERS = {'{': '}', '[': ']', '(': ')'}
+
+
+def placeholders(value):
+    """Set of placeholder names in a cooked value"""
+    if '{{' not in value:
+        return frozenset()
+    return frozenset(_PLACEHOLDER_RE.findall(value))
+
+
+def placeholder_index(model):
+    """locale -> key -> frozenset of placeholder names (keys without any omitted)"""
+    index = {section.locale: {} for section in model.sections}
+    for entry in model.entries():
+        if '{{' in entry.raw:
+            names = placeholders(decode_literal(entry.raw))
+            if names:
+                index[entry.locale][entry.key] = names
+    return index
+
+
+def _object_keys(source, brace):
+    """Property names of the object literal whose '{' is at `brace`, and its end"""
+    names = set()
+    stack = []
+    expect_name = False
+    for token in iter_tokens(source, brace):
+        text = token.text
+        if text in _OPENERS:
+            stack.append(_OPENERS[text])
+            expect_name = len(stack) == 1
+            continue
+        if stack and text == stack[-1]:
+            stack.pop()
+            if not stack:
+                return names, token.end
+            continue
+        if token.kind in ('line_comment', 'block_comment'):
+            continue
+        if len(stack) == 1 and expect_name and token.kind in ('ident', 'string'):
+            names.add(token.text.strip('\'"'))
+        if len(stack) == 1:
+            expect_name = text == ','
+    return names, len(source)
+
+
+def _key_candidates(source, name, before):
+    """Keys a variable passed to t() can hold: literals in its assignment"""
+    assignment = re.compile(r'\b(?:const|let|var)\s+' + re.escape(name) + r'\s*=([^;\n]*)')
+    found = [match for match in assignment.finditer(source, 0, before)]
+    if not found:
+        return []
+    return [literal[1] for literal in _KEY_LITERAL_RE.findall(found[-1].group(1))]
+
+
+def call_sites(root='.', paths=SOURCE_PATHS):
+    """Every t('key', {...}) call under `paths`, as CallSites"""
+    sites = []
+    for path in paths:
+        full = os.path.join(root, path)
+        if os.path.isdir(full):
+            files = sorted(os.path.join(d, f) for d, _, names in os.walk(full)
+                           for f in names if f.endswith(SOURCE_EXTENSIONS))
+        elif os.path.isfile(full):
+            files = [full]
+        else:
+            continue
+        for filename in files:
+            with open(filename, 'r', encoding='utf-8') as f:
+                source = f.read()
+            if 't(' not in source:
+                continue
+            for match in _CALL_RE.finditer(source):
+                try:
+                    params, _ = _object_keys(source, match.end() - 1)
+                except TranslationsSyntaxError:
+                    continue
+                keys = [match.group(2)] if match.group(2) else _key_candidates(source, match.group(3), match.start())
+                line = line_and_column(source, match.start())[0]
+                for key in keys:
+                    sites.append(CallSite(key, frozenset(params), os.path.relpath(filename, root), line))
+    return sites
+
+
+def check(model, sites=None, reference=REFERENCE_LOCALE, keys=None):
+    """List of PlaceholderIssue for a parsed file (only about `keys` if given)"""
+    index = placeholder_index(model)
+    expected_by_key = index.get(reference, {})
+    reference_section = model.section(reference)
+    issues = []
+
+    for section in model.sections:
+        if section.locale == reference or reference_section is None:
+            continue
+        found_by_key = index[section.locale]
+        candidates = set(found_by_key) | set(expected_by_key)
+        if keys is not None:
+            candidates &= set(keys)
+        for key in candidates:
+            if key not in reference_section or key not in section:
+                continue  # missing keys are the parity report's job
+            expected = expected_by_key.get(key, frozenset())
+            found = found_by_key.get(key, frozenset())
+            if expected != found:
+                entry = section[key]
+                issues.append(PlaceholderIssue('mismatch', section.locale, key, entry.line,
+                                               sorted(expected), sorted(found), None))
+
+    if sites is not None:
+        for site in sites:
+            if keys is not None and site.key not in keys:
+                continue
+            for locale, found_by_key in index.items():
+                missing = found_by_key.get(site.key, frozenset()) - site.params
+                if missing:
+                    entry = model.get(locale, site.key)
+                    issues.append(PlaceholderIssue('unsupplied', locale, site.key, entry.line,
+                                                   sorted(site.params), sorted(missing),
+                                                   f"{site.filename}:{site.line}"))
+    issues.sort(key=lambda issue: (issue.line, issue.kind))
+    return issues
+
+
+def check_file(filename=TRANSLATIONS_FILE, model=None):
+    """check() with the call sites found next to `filename`"""
+    if model is None:
+        model = load_translations(filename)
+    root = os.path.dirname(os.path.abspath(filename))
+    return check(model, call_sites(root))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check {{placeholders}} across locales and t() call sites')
+    parser.add_argument('--file', default=TRANSLATIONS_FILE)
+    parser.add_argument('--json', action='store_true', help='print machine-readable output')
+    args = parser.parse_args()
+
+    try:
+        issues = check_file(args.file)
+    except TranslationsSyntaxError as error:
+        print(f"{args.file}:{error.line}:{error.column}: syntax: {error.message}"
+              f" (see validate_translations.py)")
+        sys.exit(1)
+    if args.json:
+        print(json.dumps([issue._asdict() for issue in issues], ensure_ascii=False, indent=2))
+    else:
+        for issue in issues:
+            if issue.kind == 'mismatch':
+                print(f"{args.file}:{issue.line}: {issue.locale}.{issue.key} has {{{{{', '.join(issue.found)}}}}}"
+                      f" but {REFERENCE_LOCALE} has {{{{{', '.join(issue.expected)}}}}}")
+            else:
+                print(f"{args.file}:{issue.line}: {issue.locale}.{issue.key} needs {{{{{', '.join(issue.found)}}}}}"
+                      f" which {issue.where} never supplies")
+        print(f"{len(issues)} placeholder issues")
+    sys.exit(1 if issues else 0)
+
+
+if __name__ == '__main__':
+    main()
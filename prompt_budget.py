@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Size and token budget report for the prompt_* templates in translations.ts.
+
+Every Gemini call in services/geminiService.ts starts from one of these
+templates, so their size drives latency and cost. For each prompt and
+locale (filled from en like t() does) this reports:
+
+  chars / tokens   size of the template after its {{placeholders}} are
+                   expanded from sample fixtures, with an approximate token
+                   count (no tokenizer is available offline)
+  unfilled         placeholders no fixture covers, typically corrupted
+                   names such as {{courtStaгe}}
+
+It also lists instruction blocks (runs of identical lines) shared by
+several prompts of one locale, and prompts whose own locale versions
+differ in size by more than MAX_LOCALE_RATIO.
+
+Budgets are a JSON object of key -> maximum tokens, with "*" as the
+default for every other prompt; any prompt over budget exits 1, so the
+report can gate a build.
+
+    python prompt_budget.py [--file translations.ts] [--fixtures FILE]
+                            [--budgets FILE] [--max-tokens N] [--json]
+"""
+import argparse
+import json
+import math
+import re
+import sys
+from collections import namedtuple
+
+from placeholders import placeholders
+from translations_model import TRANSLATIONS_FILE, decode_literal, load_translations
+
+PromptSize = namedtuple('PromptSize', 'key locale source chars tokens template_chars template_tokens unfilled')
+SharedBlock = namedtuple('SharedBlock', 'locale keys chars tokens text')
+Disparity = namedtuple('Disparity', 'key smallest largest ratio')
+OverBudget = namedtuple('OverBudget', 'key locale tokens budget')
+
+PROMPT_PREFIX = 'prompt_'
+FALLBACK_LOCALE = 'en'
+# Average characters per token for ASCII and for other (mostly Cyrillic)
+# words; BPE vocabularies split non-Latin scripts into shorter pieces
+ASCII_CHARS_PER_TOKEN = 4.0
+OTHER_CHARS_PER_TOKEN = 2.5
+# Shared blocks shorter than this are boilerplate not worth reporting
+MIN_BLOCK_CHARS = 120
+MAX_LOCALE_RATIO = 1.5
+
+_LOREM = ("The client signed a supply contract on 12 March; the supplier delivered late "
+          "and the client withheld payment. The supplier sued for the debt and a penalty. ")
+# Representative values for the placeholders the prompts use
+SAMPLE_FIXTURES = {
+    'caseDetailsWithFiles': _LOREM * 20,
+    'clientName': 'Alisher Karimov',
+    'clientRole': 'Defendant',
+    'courtType': 'Economic court',
+    'courtStage': 'First instance',
+    'participantsList': '- Alisher Karimov (Defendant)\n- Tashkent Supply LLC (Plaintiff)\n- Judge',
+    'article': 'Article 333 of the Civil Code',
+    'summary': _LOREM * 4,
+    'tasksList': '- File the response\n- Collect invoices\n- Prepare witness list',
+    'documentText': _LOREM * 20,
+    'question': 'What penalty does the contract set for late delivery?',
+}
+
+_PIECE_RE = re.compile(r'\w+|[^\w\s]')
+
+
+def approximate_tokens(text):
+    """Token estimate from word pieces, by script"""
+    total = 0
+    for piece in _PIECE_RE.findall(text):
+        per_token = ASCII_CHARS_PER_TOKEN if piece.isascii() else OTHER_CHARS_PER_TOKEN
+        total += math.ceil(len(piece) / per_token)
+    return total
+
+
+def expand(template, fixtures):
+    """Template with every fixture substituted, as t(key, fixtures) would"""
+    for name, value in fixtures.items():
+        template = template.replace('{{' + name + '}}', value)
+    return template
+
+
+def prompt_templates(model, prefix=PROMPT_PREFIX):
+    """locale -> key -> (cooked template, locale it came from)"""
+    base = model.section(FALLBACK_LOCALE)
+    fallback = {}
+    if base is not None:
+        fallback = {key: decode_literal(entry.raw) for key, entry in base.by_key.items() if key.startswith(prefix)}
+    templates = {}
+    for locale, section in model.locales.items():
+        found = {key: (value, FALLBACK_LOCALE) for key, value in fallback.items()}
+        for key, entry in section.by_key.items():
+            if key.startswith(prefix):
+                found[key] = (decode_literal(entry.raw), locale)
+        if found:
+            templates[locale] = found
+    return templates
+
+
+def prompt_sizes(templates, fixtures=SAMPLE_FIXTURES):
+    sizes = []
+    for locale, found in templates.items():
+        for key, (template, source) in sorted(found.items()):
+            text = expand(template, fixtures)
+            sizes.append(PromptSize(key, locale, source, len(text), approximate_tokens(text),
+                                    len(template), approximate_tokens(template), sorted(placeholders(text))))
+    return sizes
+
+
+def _join_runs(first, second):
+    """Union of two line runs when one contains or overlaps the other, else None"""
+    for outer, inner in ((first, second), (second, first)):
+        for start in range(len(outer) - len(inner) + 1):
+            if outer[start:start + len(inner)] == inner:
+                return outer
+    for left, right in ((first, second), (second, first)):
+        for size in range(min(len(left), len(right)) - 1, 0, -1):
+            if left[-size:] == right[:size]:
+                return left + right[size:]
+    return None
+
+
+def _merge_runs(runs):
+    """Merge runs that contain or overlap one another, uniting their owners,
+    so every shared line is reported in one block"""
+    merged = [(run, set(keys)) for run, keys in runs]
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(i + 1, len(merged)):
+                joined = _join_runs(merged[i][0], merged[j][0])
+                if joined is not None:
+                    merged[i] = joined, merged[i][1] | merged.pop(j)[1]
+                    changed = True
+                    break
+            if changed:
+                break
+    return merged
+
+
+def shared_blocks(templates, min_chars=MIN_BLOCK_CHARS):
+    """Runs of identical lines that several prompts of one locale repeat.
+
+    Runs that contain or overlap one another are merged into one block
+    listing every prompt that holds any part of it.
+    """
+    blocks = []
+    for locale, found in templates.items():
+        own = {key: template for key, (template, source) in found.items() if source == locale}
+        lines = {key: [line.strip() for line in template.split('\n')] for key, template in own.items()}
+        owners = {}
+        for key, key_lines in lines.items():
+            for line in key_lines:
+                if line:
+                    owners.setdefault(line, set()).add(key)
+        seen = {}
+        for key, key_lines in sorted(lines.items()):
+            run, keys = [], None
+            for line in key_lines + [None]:
+                sharing = owners.get(line, set()) if line else keys
+                common = sharing if keys is None else (keys & sharing if sharing else set())
+                if line is not None and len(common or ()) > 1:
+                    run.append(line)
+                    keys = common
+                    continue
+                block = tuple(part for part in run if part)
+                if len('\n'.join(block)) >= min_chars and block not in seen:
+                    seen[block] = keys
+                run, keys = [], None
+                if line and len(owners.get(line, ())) > 1:
+                    run, keys = [line], owners[line]
+        for block, keys in _merge_runs(seen.items()):
+            text = '\n'.join(block)
+            blocks.append(SharedBlock(locale, sorted(keys), len(text), approximate_tokens(text), text))
+    blocks.sort(key=lambda block: -block.tokens * (len(block.keys) - 1))
+    return blocks
+
+
+def disparities(sizes, max_ratio=MAX_LOCALE_RATIO):
+    """Prompts whose locale versions differ in template size by more than max_ratio"""
+    by_key = {}
+    for size in sizes:
+        if size.source == size.locale:
+            by_key.setdefault(size.key, []).append(size)
+    found = []
+    for key, versions in sorted(by_key.items()):
+        if len(versions) < 2:
+            continue
+        smallest = min(versions, key=lambda size: size.template_tokens)
+        largest = max(versions, key=lambda size: size.template_tokens)
+        ratio = largest.template_tokens / max(smallest.template_tokens, 1)
+        if ratio > max_ratio:
+            found.append(Disparity(key, smallest.locale, largest.locale, round(ratio, 2)))
+    return found
+
+
+def over_budget(sizes, budgets):
+    found = []
+    for size in sizes:
+        budget = budgets.get(size.key, budgets.get('*'))
+        if budget is not None and size.tokens > budget:
+            found.append(OverBudget(size.key, size.locale, size.tokens, budget))
+    return found
+
+
+def analyze(model, fixtures=SAMPLE_FIXTURES, budgets=None):
+    """Report dict with prompts, shared_blocks, disparities and over_budget"""
+    templates = prompt_templates(model)
+    sizes = prompt_sizes(templates, fixtures)
+    return {
+        'prompts': sizes,
+        'shared_blocks': shared_blocks(templates),
+        'disparities': disparities(sizes),
+        'over_budget': over_budget(sizes, budgets or {}),
+    }
+
+
+def _read_json(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report prompt sizes and enforce token budgets')
+    parser.add_argument('--file', default=TRANSLATIONS_FILE)
+    parser.add_argument('--fixtures', help='JSON object of placeholder -> sample value')
+    parser.add_argument('--budgets', help='JSON object of prompt key (or "*") -> maximum tokens')
+    parser.add_argument('--max-tokens', type=int, help='budget for every prompt without its own')
+    parser.add_argument('--json', action='store_true', help='print machine-readable output')
+    args = parser.parse_args()
+
+    fixtures = dict(SAMPLE_FIXTURES)
+    if args.fixtures:
+        fixtures.update(_read_json(args.fixtures))
+    budgets = _read_json(args.budgets) if args.budgets else {}
+    if args.max_tokens is not None:
+        budgets['*'] = args.max_tokens
+    report = analyze(load_translations(args.file), fixtures, budgets)
+
+    if args.json:
+        print(json.dumps({name: [item._asdict() for item in items] for name, items in report.items()},
+                         ensure_ascii=False, indent=2))
+    else:
+        print(f"{'prompt':<36} {'locale':<8} {'chars':>7} {'tokens':>7} {'template':>9}  unfilled")
+        for size in report['prompts']:
+            locale = size.locale if size.source == size.locale else f"{size.locale}<{size.source}"
+            print(f"{size.key:<36} {locale:<8} {size.chars:>7} {size.tokens:>7} {size.template_tokens:>9}  "
+                  f"{' '.join(size.unfilled)}")
+        for block in report['shared_blocks']:
+            print(f"shared {block.locale} ~{block.tokens} tokens in {', '.join(block.keys)}: {block.text[:60]!r}")
+        for item in report['disparities']:
+            print(f"{item.key}: {item.largest} is {item.ratio}x the size of {item.smallest}")
+        for item in report['over_budget']:
+            print(f"❌ {item.locale}.{item.key}: {item.tokens} tokens over budget {item.budget}")
+        total = sum(size.tokens for size in report['prompts'])
+        print(f"{len(report['prompts'])} prompts, ~{total} tokens with fixtures, "
+              f"{len(report['shared_blocks'])} shared blocks, {len(report['over_budget'])} over budget")
+    sys.exit(1 if report['over_budget'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,46 +2,37 @@
 """
 Remove duplicate 'ru' section from translations.ts
 """
+from translations_model import parse_translations
 
 def read_file(filename):
     with open(filename, 'r', encoding='utf-8') as f:
-        return f.readlines()
+        return f.read()
 
-def write_file(filename, lines):
+def write_file(filename, content):
     with open(filename, 'w', encoding='utf-8') as f:
-        f.writelines(lines)
+        f.write(content)
 
 def main():
     print("Reading translations.ts...")
-    lines = read_file('translations.ts')
+    content = read_file('translations.ts')
+    model = parse_translations(content, strict=False)
     
-    # Find the first 'ru': { (around line 699) and remove it until the next closing brace
-    # We need to remove from line 699 to line 1521 (the duplicate uz-cyrl content in 'ru')
+    # The first 'ru' block is the duplicate (it held a copy of uz-cyrl);
+    # remove it up to the line where the second 'ru' starts
+    sections = model.duplicate_locales.get('ru', [])
     
-    first_ru_found = False
-    first_ru_line = -1
-    second_ru_line = -1
-    
-    for i, line in enumerate(lines):
-        if "'ru': {" in line:
-            if not first_ru_found:
-                first_ru_line = i
-                first_ru_found = True
-                print(f"First 'ru' found at line {i+1}")
-            else:
-                second_ru_line = i
-                print(f"Second 'ru' found at line {i+1}")
-                break
-    
-    if first_ru_line >= 0 and second_ru_line >= 0:
-        print(f"Removing lines {first_ru_line+1} to {second_ru_line}")
-        # Remove the duplicate section (from first 'ru' to just before second 'ru')
-        # We need to keep the closing brace and comma before the second 'ru'
-        new_lines = lines[:first_ru_line] + lines[second_ru_line:]
+    if len(sections) >= 2:
+        first, second = sections[0], sections[1]
+        print(f"First 'ru' found at line {first.line}")
+        print(f"Second 'ru' found at line {second.line}")
+        start = content.rfind('\n', 0, first.key_span[0]) + 1
+        end = content.rfind('\n', 0, second.key_span[0]) + 1
+        print(f"Removing lines {first.line} to {second.line - 1}")
+        new_content = content[:start] + content[end:]
         
-        print(f"Removed {second_ru_line - first_ru_line} lines")
+        print(f"Removed {second.line - first.line} lines")
         print("Writing fixed file...")
-        write_file('translations.ts', new_lines)
+        write_file('translations.ts', new_content)
         print("✅ Done! Duplicate 'ru' section removed.")
     else:
         print("✗ Could not find duplicate 'ru' sections")
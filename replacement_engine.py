@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Single-pass multi-pattern replacement engine shared by the fix_* scripts.
+
+A rule table (dict or list of (old, new) pairs) is compiled once into a
+trie-shaped regular expression. Applying it scans the text a single time,
+always taking the leftmost-longest match, so the result no longer depends
+on the order of the rules and the cost no longer grows with the number of
+rules times the size of the file.
+"""
+import re
+from collections import Counter
+
+_END = ''
+
+
+def _build_trie(keys):
+    """Build a nested-dict trie; the empty string marks the end of a key"""
+    root = {}
+    for key in keys:
+        node = root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[_END] = True
+    return root
+
+
+def _trie_to_pattern(node):
+    """Turn a trie node into a regex fragment that prefers the longest key"""
+    terminal = _END in node
+    branches = []
+    for ch in sorted(c for c in node if c != _END):
+        literal = ch
+        child = node[ch]
+        # Collapse single-child chains into one literal run
+        while len(child) == 1 and _END not in child:
+            (next_ch, next_child), = child.items()
+            literal += next_ch
+            child = next_child
+        branches.append(re.escape(literal) + _trie_to_pattern(child))
+
+    if not branches:
+        return ''
+    if len(branches) == 1 and not terminal:
+        return branches[0]
+    body = '(?:' + '|'.join(branches) + ')'
+    # Greedy '?' tries the longer continuation first and falls back to
+    # the key that ends at this node
+    return body + '?' if terminal else body
+
+
+def unprotected_spans(text, protected):
+    """(start, end) of the parts of `text` outside sorted protected spans"""
+    pos = 0
+    for start, end in protected:
+        if start > pos:
+            yield pos, start
+        pos = max(pos, end)
+    if pos < len(text):
+        yield pos, len(text)
+
+
+def _rule_pairs(rules):
+    """Accept a mapping or an iterable of (old, new) pairs"""
+    if hasattr(rules, 'items'):
+        return list(rules.items())
+    return [tuple(pair) for pair in rules]
+
+
+class Replacer:
+    """A compiled rule table that rewrites text in one left-to-right pass"""
+
+    def __init__(self, rules, pattern_source=None):
+        table = {}
+        for old, new in _rule_pairs(rules):
+            if not old:
+                raise ValueError('Replacement rule with an empty pattern')
+            # Later duplicates win, exactly like a dict literal
+            table[old] = new
+        self.table = table
+        if pattern_source is None:
+            # Callers with a cached pattern for the same table skip the trie
+            pattern_source = _trie_to_pattern(_build_trie(table)) if table else ''
+        self.pattern_source = pattern_source
+        self.pattern = re.compile(self.pattern_source) if table else None
+
+    def __len__(self):
+        return len(self.table)
+
+    def apply(self, text, protected=None):
+        """Return (new_text, Counter of hits per rule).
+
+        `protected` is an optional sorted list of (start, end) spans that are
+        skipped by offset: nothing inside them is matched or rewritten, and
+        no match crosses their edges.
+        """
+        counts = Counter()
+        if self.pattern is None:
+            return text, counts
+        table = self.table
+
+        def substitute(match):
+            old = match.group(0)
+            counts[old] += 1
+            return table[old]
+
+        if not protected:
+            return self.pattern.sub(substitute, text), counts
+        pieces = []
+        pos = 0
+        for start, end in unprotected_spans(text, protected):
+            pieces.append(text[pos:start])
+            pieces.append(self.pattern.sub(substitute, text[start:end]))
+            pos = end
+        pieces.append(text[pos:])
+        return ''.join(pieces), counts
+
+    def finditer(self, text, protected=None):
+        """Yield (start, end, old, new) for every match without rewriting"""
+        if self.pattern is None:
+            return
+        gaps = unprotected_spans(text, protected) if protected else [(0, len(text))]
+        for start, end in gaps:
+            for match in self.pattern.finditer(text, start, end):
+                old = match.group(0)
+                yield match.start(), match.end(), old, self.table[old]
+
+    def report(self, counts):
+        """Print per-rule hit counts in the style used by the fix scripts"""
+        for old, count in counts.most_common():
+            print(f"  ✓ Replaced '{old[:50]}' → '{self.table[old][:50]}' ({count} times)")
+
+
+def compile_rules(rules):
+    """Compile a rule table into a reusable Replacer"""
+    return Replacer(rules)
+
+
+def replace_all(text, rules):
+    """One-off helper: compile `rules` and apply them to `text`"""
+    return compile_rules(rules).apply(text)
@@ -1,89 +1,82 @@
 # -*- coding: utf-8 -*-
 """
 Restore Russian translations from backup file
+
+Merges the 'ru' section (or --locale) of the backup into translations.ts
+key by key instead of replacing the whole section, so keys added since
+the backup survive. Without a base only keys missing from translations.ts
+are added and differing values are listed as conflicts; give --base (a
+file) or --base-run (a journal run) for a full three-way merge.
 """
+import argparse
+import json
+
+from translations_journal import Journal, snapshot
+from translations_merge import apply_merge, merge_values
+from translations_model import parse_translations
 
 def read_file(filename):
     with open(filename, 'r', encoding='utf-8') as f:
         return f.read()
 
-def write_file(filename, content):
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(content)
-
 def extract_section(content, section_name):
-    """Extract a language section from translations file"""
-    lines = content.split('\n')
-    section_lines = []
-    in_section = False
-    brace_count = 0
-    
-    for line in lines:
-        if f"'{section_name}':" in line and '{' in line:
-            in_section = True
-            brace_count = 1
-            section_lines.append(line)
-            continue
-        
-        if in_section:
-            section_lines.append(line)
-            brace_count += line.count('{')
-            brace_count -= line.count('}')
-            
-            if brace_count == 0:
-                break
-    
-    return '\n'.join(section_lines)
+    """Extract a language section (from its key to its closing brace)"""
+    # Backups may be damaged, so unclosed braces are tolerated here
+    model = parse_translations(content, strict=False)
+    section = model.section(section_name)
+    if section is None:
+        return ''
+    return content[section.key_span[0]:section.body_span[1]]
 
 def main():
+    parser = argparse.ArgumentParser(description='Merge a locale from a backup into translations.ts')
+    parser.add_argument('--locale', default='ru')
+    parser.add_argument('--file', default='translations.ts')
+    parser.add_argument('--backup', default='translations.backup.ts')
+    parser.add_argument('--base', help='common ancestor file for a three-way merge')
+    parser.add_argument('--base-run', type=int, help='journal run to use as the common ancestor')
+    parser.add_argument('--conflicts', help='write the conflict list to this JSON file')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+    locale = args.locale
+
     print("Reading files...")
-    current = read_file('translations.ts')
-    backup = read_file('translations.backup.ts')
-    
-    print("Extracting Russian section from backup...")
-    ru_section = extract_section(backup, 'ru')
-    
-    if not ru_section:
-        print("✗ Could not find 'ru' section in backup")
+    model = parse_translations(read_file(args.file))
+    backup = parse_translations(read_file(args.backup), strict=False)
+
+    if backup.section(locale) is None or model.section(locale) is None:
+        print(f"✗ Could not find '{locale}' section in both files")
+        return
+
+    base = None
+    if args.base:
+        base = snapshot(parse_translations(read_file(args.base), strict=False)).get(locale, {})
+    elif args.base_run is not None:
+        base = Journal(args.file).snapshot_at(args.base_run, model).get(locale, {})
+
+    print(f"Merging '{locale}' from {args.backup} ({'three-way' if base is not None else 'missing keys only'})...")
+    merged, conflicts = merge_values(base, snapshot(model)[locale], snapshot(backup)[locale], locale)
+    editor = apply_merge(model, locale, merged)
+    print(f"  {len(editor)} edits, {len(conflicts)} conflicts")
+
+    for conflict in conflicts:
+        print(f"  ✗ Conflict: {conflict.key} (kept current value)")
+    if args.conflicts:
+        with open(args.conflicts, 'w', encoding='utf-8') as f:
+            # Drop the leading delimiter of the stored form; keep the raw body
+            rows = [{field: value[1:] if field in ('base', 'current', 'backup') and value else value
+                     for field, value in c._asdict().items()} for c in conflicts]
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+    if args.dry_run or not len(editor):
+        print("✓ Nothing written")
         return
-    
-    print(f"Found Russian section ({len(ru_section)} characters)")
-    
-    print("Replacing Russian section in current file...")
-    
-    # Find and replace the 'ru' section
-    lines = current.split('\n')
-    new_lines = []
-    in_ru_section = False
-    brace_count = 0
-    skip_until_next_section = False
-    
-    for i, line in enumerate(lines):
-        if "'ru':" in line and '{' in line and not in_ru_section:
-            in_ru_section = True
-            brace_count = 1
-            skip_until_next_section = True
-            # Insert the backup ru section
-            new_lines.append(ru_section)
-            continue
-        
-        if skip_until_next_section:
-            brace_count += line.count('{')
-            brace_count -= line.count('}')
-            
-            if brace_count == 0:
-                skip_until_next_section = False
-                in_ru_section = False
-            continue
-        
-        new_lines.append(line)
-    
-    result = '\n'.join(new_lines)
-    
+
     print("Writing updated file...")
-    write_file('translations.ts', result)
-    
-    print("✅ Done! Russian translations restored from backup.")
+    editor.save(args.file)
+    Journal(args.file).record(model, parse_translations(read_file(args.file)), f'merge {locale} from {args.backup}')
+
+    print(f"✅ Done! {locale} translations merged from backup.")
 
 if __name__ == '__main__':
     main()
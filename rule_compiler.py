@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+Rule-set compiler: turn a replacement table into a minimal table for the
+single-pass engine and explain everything that was dropped or is risky.
+
+Diagnostics:
+  identity    'Notes' -> 'Notes'; dropped
+  duplicate   the same pattern listed twice; the last one is kept, as in a
+              dict literal
+  shadowed    under the old one-rule-at-a-time loop an earlier, shorter rule
+              rewrote every occurrence first ('q' before 'qўш'), so the
+              longer rule never fired; the single-pass engine applies it,
+              so this is a note on the migration, not a failure
+  chained     a rule's output contains another rule's pattern; the old loop
+              rewrote it again, the single-pass engine does not
+  overlap     a pattern's suffix is another pattern's prefix and the
+              engine's output depends on which of the two it matches: the
+              shared characters are rewritten, and taking the other match
+              would give a different result ('ts' + 'sh' in 'tsh')
+  redundant   the rest of the table already produces the same output and no
+              other pattern crosses its edges; dropped
+
+Rule tables live in rules/*.json as {"rules": {old: new}} plus optional
+scope metadata (locales, keys, exclude_keys, target, protect) and the
+order the old loop applied them in. load_rules() compiles a file once and
+caches the result under .rules_cache/, keyed by the SHA-256 of the file's
+bytes, so repeat runs skip the analysis and the trie build.
+
+    python rule_compiler.py rules/full_cyrillic_conversion.json [--emit minimal.json]
+    python rule_compiler.py legacy_script.py:DICT_NAME --order longest
+    python rule_compiler.py --all
+"""
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import os
+import sys
+from collections import namedtuple
+
+from replacement_engine import Replacer
+from translations_editor import write_atomic
+
+Rule = namedtuple('Rule', 'old new line')
+Diagnostic = namedtuple('Diagnostic', 'kind rule other message')
+
+RULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules')
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.rules_cache')
+# Bump when the compiled form changes so stale cache entries are ignored
+CACHE_VERSION = 2
+SCOPE_FIELDS = ('locales', 'keys', 'exclude_keys', 'target', 'protect')
+ORDERS = ('listed', 'longest')
+
+
+class RuleFileError(ValueError):
+    """A rule file that cannot be used"""
+
+    def __init__(self, filename, message):
+        super().__init__(f"{filename}: {message}")
+        self.filename = filename
+
+
+def rules_from_source(filename, name):
+    """Read the dict literal assigned to `name` as Rules, duplicates included"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename)
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Assign) or not isinstance(node.value, ast.Dict):
+            continue
+        if not any(isinstance(target, ast.Name) and target.id == name for target in node.targets):
+            continue
+        return [
+            Rule(ast.literal_eval(key), ast.literal_eval(value), key.lineno)
+            for key, value in zip(node.value.keys, node.value.values)
+        ]
+    raise KeyError(f'No dict literal named {name!r} in {filename}')
+
+
+def _rule_lines(text, pairs):
+    """Line of each pair's key in the JSON source, None when not found"""
+    lines = []
+    cursor = 0
+    for old, _ in pairs:
+        found = text.find(json.dumps(old, ensure_ascii=False) + ':', cursor)
+        if found < 0:
+            lines.append(None)
+            continue
+        lines.append(text.count('\n', 0, found) + 1)
+        cursor = found + 1
+    return lines
+
+
+def read_rule_file(filename):
+    """(rules, scope, order) of a rule file; duplicate keys are kept"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        text = f.read()
+    try:
+        # Rule tables are read as pair lists so duplicates reach the compiler
+        data = json.loads(text, object_pairs_hook=lambda pairs: pairs)
+    except json.JSONDecodeError as e:
+        raise RuleFileError(filename, f"invalid JSON: {e}") from None
+    fields = dict(data) if isinstance(data, list) else None
+    if fields is None or not isinstance(fields.get('rules'), list):
+        raise RuleFileError(filename, "expected an object with a 'rules' object")
+    pairs = fields['rules']
+    for old, new in pairs:
+        if not isinstance(new, str) or not old:
+            raise RuleFileError(filename, f"rule {old!r} must map a non-empty string to a string")
+    order = fields.get('order', 'listed')
+    if order not in ORDERS:
+        raise RuleFileError(filename, f"order must be one of {ORDERS}, not {order!r}")
+    scope = {field: fields[field] for field in SCOPE_FIELDS if field in fields}
+    rules = [Rule(old, new, line) for (old, new), line in zip(pairs, _rule_lines(text, pairs))]
+    return rules, scope, order
+
+
+def _overlaps(left, right):
+    """True when a proper suffix of `left` is a proper prefix of `right`.
+
+    Overlaps made only of punctuation (the closing and opening quote of two
+    quoted sentences) are ignored; they never occur inside a word.
+    """
+    for size in range(1, min(len(left), len(right))):
+        if left.endswith(right[:size]) and any(ch.isalnum() for ch in right[:size]):
+            return True
+    return False
+
+
+def _overlap_changes_output(left, right, table, replacer):
+    """True when some text where `left` runs into `right` comes out differently
+    depending on which of the two the engine matches.
+
+    Rules that keep the shared characters as they are only collide when two
+    whole patterns run together sharing a letter ('riгҳts' + 'strateгy');
+    those are not reported.
+    """
+    for size in range(1, min(len(left), len(right))):
+        shared = right[:size]
+        if not left.endswith(shared):
+            continue
+        if table[left].endswith(shared) and table[right].startswith(shared):
+            continue
+        text = left + right[size:]
+        split = len(left) - size
+        if replacer.apply(text)[0] != replacer.apply(text[:split])[0] + replacer.apply(text[split:])[0]:
+            return True
+    return False
+
+
+class CompiledRules:
+    """Minimal table plus the diagnostics gathered while building it"""
+
+    def __init__(self, rules, order='listed'):
+        self.order = order
+        self.rules = [rule if isinstance(rule, Rule) else Rule(rule[0], rule[1], None) for rule in rules]
+        self.diagnostics = []
+        self.table = self._compile()
+        self.pattern_source = None
+
+    def _report(self, kind, rule, other, message):
+        self.diagnostics.append(Diagnostic(kind, rule, other, message))
+
+    def _compile(self):
+        # Duplicates: keep the last definition like a dict literal would
+        last = {}
+        for rule in self.rules:
+            if rule.old in last:
+                earlier = last[rule.old]
+                same = 'same' if earlier.new == rule.new else 'different'
+                self._report('duplicate', rule, earlier, f"{rule.old!r} listed again with a {same} value")
+            last[rule.old] = rule
+        ordered = [rule for rule in self.rules if last[rule.old] is rule]
+
+        live = []
+        for rule in ordered:
+            if rule.old == rule.new:
+                self._report('identity', rule, None, f"{rule.old!r} maps to itself")
+            else:
+                live.append(rule)
+
+        # Order-sensitive interactions, in the order the old loop ran them
+        live_table = {rule.old: rule.new for rule in live}
+        engine = Replacer(live_table) if live_table else None
+        applied = sorted(live, key=lambda rule: -len(rule.old)) if self.order == 'longest' else live
+        for i, earlier in enumerate(applied):
+            for later in applied[i + 1:]:
+                if earlier.old in later.old:
+                    self._report('shadowed', later, earlier,
+                                 f"{later.old!r} never matched after {earlier.old!r} ran first")
+                for first, second in ((earlier, later), (later, earlier)):
+                    if second.old in first.new and second.old not in first.old:
+                        self._report('chained', second, first,
+                                     f"{first.old!r} -> {first.new!r} produces {second.old!r}")
+                if (_overlap_changes_output(earlier.old, later.old, live_table, engine)
+                        or _overlap_changes_output(later.old, earlier.old, live_table, engine)):
+                    self._report('overlap', later, earlier,
+                                 f"{earlier.old!r} and {later.old!r} overlap")
+
+        table = dict(live_table)
+        for rule in live:
+            rest = {old: new for old, new in table.items() if old != rule.old}
+            if not rest or Replacer(rest).apply(rule.old)[0] != rule.new:
+                continue
+            crossing = [old for old in rest
+                        if _overlaps(rule.old, old) or _overlaps(old, rule.old)
+                        or (rule.old in old and old != rule.old)]
+            if crossing:
+                continue
+            self._report('redundant', rule, None, f"{rule.old!r} is already produced by shorter rules")
+            del table[rule.old]
+        return table
+
+    def replacer(self, cls=Replacer):
+        """A Replacer (or subclass) for the minimal table"""
+        replacer = cls(self.table, self.pattern_source)
+        self.pattern_source = replacer.pattern_source
+        return replacer
+
+    def to_json(self):
+        """Plain data for the on-disk cache"""
+        return {
+            'version': CACHE_VERSION,
+            'order': self.order,
+            'rules': [list(rule) for rule in self.rules],
+            'diagnostics': [[d.kind, list(d.rule), list(d.other) if d.other else None, d.message]
+                            for d in self.diagnostics],
+            'table': list(self.table.items()),
+            'pattern_source': self.replacer().pattern_source,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """Rebuild from to_json() output without recompiling"""
+        compiled = cls.__new__(cls)
+        compiled.order = data['order']
+        compiled.rules = [Rule(*rule) for rule in data['rules']]
+        compiled.diagnostics = [
+            Diagnostic(kind, Rule(*rule), Rule(*other) if other else None, message)
+            for kind, rule, other, message in data['diagnostics']
+        ]
+        compiled.table = dict(data['table'])
+        compiled.pattern_source = data['pattern_source']
+        return compiled
+
+
+def compile_rule_table(rules, order='listed'):
+    """Compile (old, new) pairs or Rules into a CompiledRules"""
+    return CompiledRules(rules, order)
+
+
+def rule_file(name):
+    """Path of a rule file given its name ('fix_maumot') or a path"""
+    if name.endswith('.json'):
+        return name
+    return os.path.join(RULES_DIR, name + '.json')
+
+
+def load_rules(name, use_cache=True):
+    """(CompiledRules, scope) for a rule file, from the cache when possible"""
+    filename = rule_file(name)
+    with open(filename, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    cache_file = os.path.join(CACHE_DIR, f"{digest}.json")
+    if use_cache:
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                return CompiledRules.from_json(data), data['scope']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    rules, scope, order = read_rule_file(filename)
+    compiled = compile_rule_table(rules, order)
+    if use_cache:
+        data = compiled.to_json()
+        data['scope'] = scope
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            write_atomic(cache_file, json.dumps(data, ensure_ascii=False))
+        except OSError:
+            # A read-only checkout still works, just without the cache
+            pass
+    return compiled, scope
+
+
+def _print_report(label, compiled):
+    print(f"{label}: {len(compiled.rules)} rules -> {len(compiled.table)}")
+    for diagnostic in compiled.diagnostics:
+        line = diagnostic.rule.line
+        where = f" (line {line})" if line else ''
+        print(f"  {diagnostic.kind:<9}{where} {diagnostic.message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile and lint replacement rule tables')
+    parser.add_argument('tables', nargs='*', help='rules/NAME.json or FILE.py:DICT_NAME')
+    parser.add_argument('--all', action='store_true', help='check every file in rules/')
+    parser.add_argument('--order', choices=('listed', 'longest'), default='listed',
+                        help='order the old loop applied the rules in')
+    parser.add_argument('--emit', help='write the minimal table of a single input as JSON')
+    args = parser.parse_args()
+
+    specs = sorted(glob.glob(os.path.join(RULES_DIR, '*.json'))) if args.all else args.tables
+    if not specs:
+        parser.error('give rules/NAME.json, FILE.py:DICT_NAME or --all')
+    if args.emit and len(specs) != 1:
+        parser.error('--emit needs exactly one table')
+
+    problems = 0
+    for spec in specs:
+        if spec.endswith('.json'):
+            try:
+                rules, _, order = read_rule_file(spec)
+            except RuleFileError as e:
+                print(f"✗ {e}")
+                problems += 1
+                continue
+            compiled = compile_rule_table(rules, order)
+        else:
+            if ':' not in spec:
+                parser.error(f'{spec}: give rules/NAME.json or FILE.py:DICT_NAME')
+            filename, name = spec.rsplit(':', 1)
+            try:
+                rules = rules_from_source(filename, name)
+            except OSError as e:
+                parser.error(f'{filename}: {e.strerror}')
+            except KeyError:
+                parser.error(f'no dict literal named {name!r} in {filename}; rule tables now live in rules/*.json')
+            compiled = compile_rule_table(rules, args.order)
+        _print_report(os.path.relpath(spec) if spec.endswith('.json') else spec, compiled)
+        problems += sum(1 for d in compiled.diagnostics if d.kind in ('duplicate', 'chained'))
+        if args.emit:
+            with open(args.emit, 'w', encoding='utf-8') as f:
+                json.dump(compiled.table, f, ensure_ascii=False, indent=2)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Replacement stages scoped to the parsed structure of translations.ts.
+
+A RuleStage applies a compiled rule table only where it belongs: to the
+values (or the keys) of chosen locales, optionally limited to keys that
+match glob patterns such as 'prompt_*'. Keys, comments and code are never
+scanned by value rules, and other locales are never scanned at all, so a
+rule like 'h' -> 'ҳ' can no longer leak into the English section.
+"""
+from collections import Counter, namedtuple
+from fnmatch import fnmatchcase
+
+from rule_compiler import CompiledRules, compile_rule_table, load_rules
+from translations_editor import TranslationsEditor, write_atomic
+from translations_journal import Journal
+from translations_model import TRANSLATIONS_FILE, parse_translations, protected_spans
+
+TARGETS = ('values', 'keys')
+
+# A key rename left undone because its new name is already taken
+RenameConflict = namedtuple('RenameConflict', 'locale key new_key')
+
+
+def _patterns(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return (value,)
+    return tuple(value)
+
+
+class RuleStage:
+    """A rule table plus the part of the file it is allowed to touch"""
+
+    def __init__(self, rules, locales=None, keys=None, exclude_keys=None,
+                 target='values', name=None, protect=True):
+        if target not in TARGETS:
+            raise ValueError(f'target must be one of {TARGETS}, not {target!r}')
+        # Identities, duplicates and redundant rules are dropped up front
+        if not isinstance(rules, CompiledRules):
+            rules = compile_rule_table(rules.items() if isinstance(rules, dict) else rules)
+        self.compiled = rules
+        self.replacer = self.compiled.replacer()
+        self.locales = _patterns(locales)
+        self.keys = _patterns(keys)
+        self.exclude_keys = _patterns(exclude_keys)
+        self.target = target
+        self.name = name or 'rules'
+        # Value rules skip escapes, placeholders, ${} and identifiers
+        self.protect = protect
+        # Renames skipped by the last apply(), as RenameConflicts
+        self.conflicts = []
+
+    def selects(self, entry):
+        """True when `entry` is inside this stage's scope"""
+        if self.locales is not None and entry.locale not in self.locales:
+            return False
+        if self.keys is not None and not any(fnmatchcase(entry.key, p) for p in self.keys):
+            return False
+        if self.exclude_keys and any(fnmatchcase(entry.key, p) for p in self.exclude_keys):
+            return False
+        return True
+
+    def apply(self, model, editor=None):
+        """Record this stage's edits; returns (editor, Counter of rule hits)
+
+        A key whose new name already exists in its section, or is taken by
+        an earlier rename in this pass, keeps its name and is listed in
+        self.conflicts instead.
+        """
+        if editor is None:
+            editor = TranslationsEditor(model)
+        counts = Counter()
+        self.conflicts = []
+        apply = self.replacer.apply
+        pattern = self.replacer.pattern
+        for section in model.sections:
+            if self.locales is not None and section.locale not in self.locales:
+                continue
+            renamed = set()
+            for key, entry in section.by_key.items():
+                if not self.selects(entry):
+                    continue
+                if self.target == 'values':
+                    # Work on the literal body as written so untouched
+                    # escapes stay byte-identical
+                    if pattern is None or not pattern.search(entry.raw):
+                        continue
+                    protected = protected_spans(entry.raw) if self.protect else None
+                    raw, hits = apply(entry.raw, protected)
+                    if hits:
+                        editor.set_raw(section, key, raw)
+                else:
+                    new_key, hits = apply(key)
+                    if not hits:
+                        continue
+                    if new_key in section or new_key in renamed:
+                        self.conflicts.append(RenameConflict(section.locale, key, new_key))
+                        continue
+                    editor.rename_key(section, key, new_key)
+                    renamed.add(new_key)
+                counts.update(hits)
+        return editor, counts
+
+
+def load_rule_stage(rule_name, **overrides):
+    """A RuleStage for rules/<rule_name>.json with the scope the file declares"""
+    compiled, scope = load_rules(rule_name)
+    options = dict(scope, name=rule_name)
+    options.update(overrides)
+    return RuleStage(compiled, **options)
+
+
+def apply_stages(stages, filename=TRANSLATIONS_FILE, dry_run=False):
+    """Run stages in order against one parse per stage and write once.
+
+    Returns {stage name: Counter of rule hits}.
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        content = f.read()
+    before = model = parse_translations(content)
+    results = {}
+    for stage in stages:
+        editor, counts = stage.apply(model)
+        results.setdefault(stage.name, Counter()).update(counts)
+        if len(editor):
+            content = editor.render()
+            model = parse_translations(content)
+    if model is not before and not dry_run:
+        write_atomic(filename, content)
+        Journal(filename).record(before, model, ', '.join(stage.name for stage in stages))
+    return results
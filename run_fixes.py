@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Run the registered fix stages over translations.ts in one pass:
+read once, run every stage in memory, write once.
+
+    python run_fixes.py                       # every stage but the opt-in ones
+    python run_fixes.py fix_maumot fix_all_keys
+    python run_fixes.py --dry-run
+    python run_fixes.py --list
+"""
+import argparse
+
+from fix_pipeline import OPT_IN_STAGES, load_stages, run_pipeline
+from placeholders import check_file
+from translations_model import TRANSLATIONS_FILE
+
+def main():
+    parser = argparse.ArgumentParser(description='Run fix stages over translations.ts')
+    parser.add_argument('stages', nargs='*', help='stage names (default: all but opt-in stages, in pipeline order)')
+    parser.add_argument('--file', default=TRANSLATIONS_FILE)
+    parser.add_argument('--dry-run', action='store_true', help='run every stage but do not write')
+    parser.add_argument('--list', action='store_true', help='list registered stages and exit')
+    args = parser.parse_args()
+    
+    if args.list:
+        for name in load_stages():
+            print(f"{name} (opt-in)" if name in OPT_IN_STAGES else name)
+        return
+    
+    print(f"Running fix pipeline on {args.file}...")
+    document, timings = run_pipeline(args.stages, args.file, args.dry_run)
+    
+    total = sum(seconds for _, seconds, _ in timings)
+    for name, seconds, changes in sorted(timings, key=lambda t: t[1], reverse=True):
+        print(f"  {name:<28} {seconds * 1000:8.1f} ms  {changes:6d} changes")
+    print(f"  {'total':<28} {total * 1000:8.1f} ms")
+    
+    if not document.changed:
+        print("✓ Nothing to change")
+    elif args.dry_run:
+        print(f"Dry run: {args.file} would change ({len(document.original)} → {len(document.text)} characters)")
+    else:
+        print(f"✅ Done! {args.file} written once.")
+    
+    # Cheap enough to run after every write; see placeholders.py for details
+    issues = check_file(args.file, document.model)
+    if issues:
+        print(f"⚠ {len(issues)} placeholder issues (run placeholders.py for details)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Precompiled {{name}} templates for t(key, params).
+
+App.tsx's t() builds a RegExp per parameter on every call and runs it
+over the whole value, which for the prompt_* templates means several
+scans of a multi-kilobyte string per Gemini request. Here every value
+with placeholders is split once, at build time, into parts
+
+    [literal, name, literal, name, ..., literal]
+
+(even indices literal text, odd indices slot names), so rendering is one
+concatenation. For the hot prompts build_i18n.py also emits a renderer
+specialised to the slot sequence, e.g.
+
+    (s, p) => s[0] + (p["article"] ?? "{{article}}") + s[2]
+
+A slot without a parameter renders as {{name}}, as t() leaves it.
+
+    python templates.py [--file translations.ts] [--bench] [--repeat N]
+"""
+import argparse
+import json
+import re
+import time
+
+from translations_model import TRANSLATIONS_FILE, load_translations
+
+# Keys whose templates get a specialised renderer
+HOT_PREFIX = 'prompt_'
+
+# The exact form t() substitutes: no whitespace inside the braces
+_SLOT_RE = re.compile(r'\{\{([^{}\s]+)\}\}')
+
+
+def compile_template(text):
+    """[literal, name, literal, ...]; a value without slots is [text]"""
+    return _SLOT_RE.split(text)
+
+
+def slot_names(parts):
+    return parts[1::2]
+
+
+def shape(parts):
+    """Key of the specialised renderer for a template: its slot sequence"""
+    return ','.join(slot_names(parts))
+
+
+def render_parts(parts, params):
+    """Generic renderer, the same loop the loader runs for cold templates"""
+    out = [parts[0]]
+    for index in range(1, len(parts), 2):
+        name = parts[index]
+        value = params.get(name)
+        out.append('{{' + name + '}}' if value is None else value)
+        out.append(parts[index + 1])
+    return ''.join(out)
+
+
+def render_regex(text, params):
+    """What t() does today: one fresh global RegExp per parameter"""
+    for name, value in params.items():
+        text = re.compile('{{' + name + '}}').sub(lambda match: value, text)
+    return text
+
+
+def renderer_source(parts):
+    """TypeScript arrow function rendering templates of this shape"""
+    pieces = ['s[0]']
+    for index in range(1, len(parts), 2):
+        name = json.dumps(parts[index], ensure_ascii=False)
+        placeholder = json.dumps('{{' + parts[index] + '}}', ensure_ascii=False)
+        pieces.append(f'(p[{name}] ?? {placeholder})')
+        pieces.append(f's[{index + 1}]')
+    return '(s, p) => ' + ' + '.join(pieces)
+
+
+def hot_shapes(model, prefix=HOT_PREFIX):
+    """shape -> renderer source for every hot template of every locale"""
+    found = {}
+    for entry in model.entries():
+        if entry.key.startswith(prefix):
+            parts = compile_template(entry.value)
+            if len(parts) > 1:
+                found.setdefault(shape(parts), renderer_source(parts))
+    return dict(sorted(found.items()))
+
+
+def _fixture(names):
+    return {name: f'<{name}> ' * 64 for name in names}
+
+
+def benchmark(model, repeat=200, prefix=HOT_PREFIX):
+    """[(key, locale, regex renders/s, compiled renders/s)] for hot templates"""
+    results = []
+    for entry in model.entries():
+        if not entry.key.startswith(prefix):
+            continue
+        text = entry.value
+        parts = compile_template(text)
+        if len(parts) < 2:
+            continue
+        params = _fixture(set(slot_names(parts)))
+        assert render_regex(text, params) == render_parts(parts, params), entry.key
+        timings = []
+        for render, template in ((render_regex, text), (render_parts, parts)):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                render(template, params)
+            timings.append(repeat / (time.perf_counter() - started))
+        results.append((entry.key, entry.locale, *timings))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile {{name}} templates and benchmark rendering')
+    parser.add_argument('--file', default=TRANSLATIONS_FILE)
+    parser.add_argument('--bench', action='store_true', help='compare compiled rendering with regex substitution')
+    parser.add_argument('--repeat', type=int, default=200, help='renders per template in --bench')
+    args = parser.parse_args()
+
+    model = load_translations(args.file)
+    if args.bench:
+        print(f"{'template':<36} {'locale':<8} {'regex/s':>10} {'compiled/s':>11} {'speedup':>8}")
+        for key, locale, regex, compiled in benchmark(model, args.repeat):
+            print(f"{key:<36} {locale:<8} {regex:>10.0f} {compiled:>11.0f} {compiled / regex:>7.1f}x")
+        return
+    templates = [entry for entry in model.entries() if len(compile_template(entry.value)) > 1]
+    for shape_key, source in hot_shapes(model).items():
+        print(f"{shape_key}:\n    {source}")
+    print(f"{len(templates)} templates, {len(hot_shapes(model))} hot renderer shapes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Batched in-place edits of translations.ts.
+
+Edits are recorded against the spans of a parsed TranslationsModel and
+applied together as sorted range splices in one buffer build, so bytes
+outside the edited keys are never touched. save() writes the result
+atomically (temp file + rename) so a crash never leaves a half-written
+translations.ts behind.
+"""
+import os
+import re
+import tempfile
+
+from translations_model import TRANSLATIONS_FILE, Section, encode_literal
+
+_IDENTIFIER_RE = re.compile(r'^[A-Za-z_$][\w$]*$', re.A)
+# TS also takes non-ASCII identifiers; only kept where the source had one
+_UNICODE_IDENTIFIER_RE = re.compile(r'^(?:[^\W\d]|\$)[\w$]*$')
+_TRAILING_COMMA_RE = re.compile(r'[ \t]*,?[ \t]*(?:\r?\n)?')
+
+
+def write_atomic(filename, content):
+    """Replace `filename` with `content` without ever exposing a partial file"""
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(filename) + '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(filename):
+            mode = os.stat(filename).st_mode & 0o777
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def render_key(key, original_token=None):
+    """Source form of a key, keeping the quoting style of the token it replaces"""
+    if original_token and original_token[0] in '\'"':
+        return original_token[0] + encode_literal(key, original_token[0]) + original_token[0]
+    if _IDENTIFIER_RE.match(key) or (original_token and _UNICODE_IDENTIFIER_RE.match(key)):
+        return key
+    return "'" + encode_literal(key, "'") + "'"
+
+
+class TranslationsEditor:
+    """Collects edits against one model and applies them in a single pass.
+
+    Methods take a locale name, which means its last block, or a Section of
+    the model to address one block of a locale defined more than once.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.edits = {}
+        # key_span starts of entries with a pending delete_key
+        self.deleted = set()
+
+    def __len__(self):
+        return len(self.edits)
+
+    def _section(self, locale):
+        if isinstance(locale, Section):
+            return locale
+        section = self.model.section(locale)
+        if section is None:
+            raise KeyError(f'Unknown locale {locale!r}')
+        return section
+
+    def _entries(self, locale, key):
+        """Every definition of `key`, duplicates included"""
+        section = self._section(locale)
+        entry = section.by_key.get(key)
+        if entry is None:
+            raise KeyError(f'Unknown key {key!r} in {section.locale!r}')
+        if not any(duplicate.key == key for duplicate in section.duplicates):
+            return [entry]
+        return [entry for entry in section.entries if entry.key == key]
+
+    def _splice(self, start, end, replacement):
+        self.edits[(start, end)] = replacement
+
+    def set_raw(self, locale, key, raw, quote=None):
+        """Replace the literal body of `key` with already-escaped source.
+
+        Passing a different `quote` rewrites the delimiters as well.
+        """
+        self.set_entry_raw(self._entries(locale, key)[-1], raw, quote)
+
+    def set_entry_raw(self, entry, raw, quote=None):
+        """set_raw() for one definition, such as an earlier duplicate of a key"""
+        start, end = entry.value_span
+        if quote is None or quote == entry.quote:
+            self._splice(start + 1, end - 1, raw)
+        else:
+            self._splice(start, end, quote + raw + quote)
+
+    def set_value(self, locale, key, text):
+        """Set the value of `key`, escaping it for the literal's delimiter"""
+        entry = self._entries(locale, key)[-1]
+        self.set_raw(locale, key, encode_literal(text, entry.quote))
+
+    def add_key(self, locale, key, raw, quote='"'):
+        """Append `key` with an already-escaped literal body at the end of `locale`"""
+        section = self._section(locale)
+        if key in section:
+            raise ValueError(f'Key {key!r} already exists in {section.locale!r}')
+        text = self.model.text
+        literal = render_key(key) + ': ' + quote + raw + quote
+        # Anchor after the last entry that stays, never inside a deleted span
+        kept = [entry for entry in section.entries if entry.key_span[0] not in self.deleted]
+        if not kept:
+            pos = section.body_span[0] + 1
+            line_start = text.rfind('\n', 0, section.key_span[0]) + 1
+            indent = text[line_start:section.key_span[0]] + '  '
+            self._insert(pos, '\n' + indent + literal + ',')
+            return
+        last = kept[-1]
+        line_start = text.rfind('\n', 0, last.key_span[0]) + 1
+        indent = text[line_start:last.key_span[0]]
+        comma = _TRAILING_COMMA_RE.match(text, last.value_span[1]).group(0)
+        if ',' in comma:
+            self._insert(text.index(',', last.value_span[1]) + 1, '\n' + indent + literal + ',')
+        else:
+            self._insert(last.value_span[1], ',\n' + indent + literal)
+
+    def _insert(self, pos, addition):
+        # Several keys added at the same place are kept in call order
+        self.edits[(pos, pos)] = self.edits.get((pos, pos), '') + addition
+
+    def delete_key(self, locale, key):
+        """Remove every definition of `key`, including its line when it has one to itself"""
+        text = self.model.text
+        for entry in self._entries(locale, key):
+            start, end = entry.key_span[0], entry.value_span[1]
+            end = _TRAILING_COMMA_RE.match(text, end).end()
+            line_start = text.rfind('\n', 0, start) + 1
+            if not text[line_start:start].strip() and text[end - 1:end] == '\n':
+                start = line_start
+            self._splice(start, end, '')
+            self.deleted.add(entry.key_span[0])
+
+    def rename_key(self, locale, key, new_key):
+        """Rename every definition of `key`"""
+        section = self._section(locale)
+        if new_key in section:
+            raise ValueError(f'Key {new_key!r} already exists in {section.locale!r}')
+        text = self.model.text
+        for entry in self._entries(locale, key):
+            start, end = entry.key_span
+            self._splice(start, end, render_key(new_key, text[start:end]))
+
+    def render(self):
+        """Return the edited source; edits may not overlap"""
+        text = self.model.text
+        parts = []
+        pos = 0
+        for (start, end), replacement in sorted(self.edits.items()):
+            if start < pos:
+                raise ValueError(f'Overlapping edits at line {self.model.line_of(start)}')
+            parts.append(text[pos:start])
+            parts.append(replacement)
+            pos = end
+        parts.append(text[pos:])
+        return ''.join(parts)
+
+    def save(self, filename=TRANSLATIONS_FILE):
+        """Apply all edits and write the file atomically; returns the new text"""
+        content = self.render()
+        write_atomic(filename, content)
+        return content
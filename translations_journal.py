@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed delta journal for translations.ts.
+
+Every pipeline write appends one run to .translations_journal/runs.jsonl
+listing only the keys that changed, as (locale, key, old hash, new hash).
+Values live once each under objects/, named by their SHA-256, so the
+journal grows with the number of distinct values rather than with the
+number of full-file copies.
+
+Restoring a key, a locale or the whole file to the state after some run
+touches only the keys changed since that run. Restores are journaled too,
+marked with the run they went back to, so `undo` steps past them to the
+next run still in effect instead of undoing the restore itself:
+
+    python translations_journal.py log
+    python translations_journal.py undo [N]
+    python translations_journal.py restore RUN [--locale ru] [--key app_name]
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+
+from translations_editor import TranslationsEditor, write_atomic
+from translations_model import TRANSLATIONS_FILE, load_translations
+
+JOURNAL_DIR = '.translations_journal'
+
+
+def snapshot(model):
+    """locale -> key -> stored form (delimiter + raw literal body)"""
+    return {
+        section.locale: {key: entry.quote + entry.raw for key, entry in section.by_key.items()}
+        for section in model.sections
+    }
+
+
+class Journal:
+    """The journal that sits next to one translations file"""
+
+    def __init__(self, filename=TRANSLATIONS_FILE):
+        self.filename = filename
+        self.root = os.path.join(os.path.dirname(os.path.abspath(filename)), JOURNAL_DIR)
+        self.objects = os.path.join(self.root, 'objects')
+        self.runs_file = os.path.join(self.root, 'runs.jsonl')
+
+    # Objects
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest[2:])
+
+    def put(self, stored):
+        """Store a value once and return its hash"""
+        data = stored.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+        return digest
+
+    def get(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    # Runs
+
+    def runs(self):
+        if not os.path.exists(self.runs_file):
+            return []
+        with open(self.runs_file, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def record(self, before, after, label, restores=None):
+        """Append a run with the per-key delta between two models; returns it or None"""
+        old, new = snapshot(before), snapshot(after)
+        changes = []
+        for locale in list(old) + [l for l in new if l not in old]:
+            old_values = old.get(locale, {})
+            new_values = new.get(locale, {})
+            for key in list(old_values) + [k for k in new_values if k not in old_values]:
+                old_value = old_values.get(key)
+                new_value = new_values.get(key)
+                if old_value != new_value:
+                    changes.append([
+                        locale, key,
+                        self.put(old_value) if old_value is not None else None,
+                        self.put(new_value) if new_value is not None else None,
+                    ])
+        if not changes:
+            return None
+
+        os.makedirs(self.root, exist_ok=True)
+        run = {
+            'id': len(self.runs()) + 1,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'label': label,
+            'changes': changes,
+        }
+        if restores is not None:
+            run['restores'] = restores
+        with open(self.runs_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run, ensure_ascii=False) + '\n')
+        return run
+
+    def target_state(self, run_id, locale=None, key=None):
+        """Stored values (or None for "absent") of keys changed after `run_id`"""
+        targets = {}
+        for run in self.runs():
+            if run['id'] <= run_id:
+                continue
+            for change_locale, change_key, old_hash, _ in run['changes']:
+                if locale is not None and change_locale != locale:
+                    continue
+                if key is not None and change_key != key:
+                    continue
+                # The earliest change after run_id holds the value we want back
+                targets.setdefault((change_locale, change_key), old_hash)
+        return {
+            target: self.get(digest) if digest is not None else None
+            for target, digest in targets.items()
+        }
+
+    def snapshot_at(self, run_id, model=None):
+        """Full locale -> key -> stored value map as it was right after `run_id`"""
+        if model is None:
+            model = load_translations(self.filename)
+        state = snapshot(model)
+        for (locale, key), stored in self.target_state(run_id).items():
+            if stored is None:
+                state.get(locale, {}).pop(key, None)
+            else:
+                state.setdefault(locale, {})[key] = stored
+        return state
+
+    def effective(self):
+        """Ids of the runs still in effect, oldest first.
+
+        A whole-file restore cancels every run after the one it went back
+        to; restores themselves are never in effect, so undo skips them.
+        """
+        stack = []
+        for run in self.runs():
+            restores = run.get('restores')
+            if restores is None:
+                stack.append(run['id'])
+            elif restores.get('locale') is None and restores.get('key') is None:
+                while stack and stack[-1] > restores['run']:
+                    stack.pop()
+        return stack
+
+    def restore(self, run_id, locale=None, key=None):
+        """Bring keys back to their state right after run `run_id` (0 = before any run)"""
+        model = load_translations(self.filename)
+        editor = TranslationsEditor(model)
+        targets = self.target_state(run_id, locale, key)
+        for (target_locale, target_key), new_key in _renames(model, targets).items():
+            editor.rename_key(target_locale, target_key, new_key)
+            del targets[target_locale, target_key]
+            del targets[target_locale, new_key]
+        for (target_locale, target_key), stored in targets.items():
+            entry = model.get(target_locale, target_key)
+            if stored is None:
+                if entry is not None:
+                    editor.delete_key(target_locale, target_key)
+            elif entry is None:
+                editor.add_key(target_locale, target_key, stored[1:], stored[0])
+            elif entry.quote + entry.raw != stored:
+                editor.set_raw(target_locale, target_key, stored[1:], stored[0])
+        if not len(editor):
+            return None
+        content = editor.render()
+        write_atomic(self.filename, content)
+        return self.record(model, load_translations(self.filename), f'restore to run {run_id}',
+                           restores={'run': run_id, 'locale': locale, 'key': key})
+
+    def undo(self, count=1):
+        """Revert the last `count` runs still in effect"""
+        runs = self.effective()
+        if not runs:
+            return None
+        target = runs[-count - 1] if count < len(runs) else 0
+        return self.restore(target)
+
+
+def _renames(model, targets):
+    """(locale, key) -> new key for targets that are one key renamed in place.
+
+    A key to drop whose current value is exactly what a key to bring back
+    should hold is renamed rather than deleted and re-added, so it keeps
+    its position in the section.
+    """
+    gone = {}
+    for (locale, key), stored in targets.items():
+        entry = model.get(locale, key)
+        if stored is None and entry is not None:
+            gone.setdefault((locale, entry.quote + entry.raw), []).append(key)
+    renames = {}
+    for (locale, key), stored in targets.items():
+        if stored is not None and model.get(locale, key) is None:
+            candidates = gone.get((locale, stored))
+            if candidates:
+                renames[locale, candidates.pop(0)] = key
+    return renames
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect and restore translations.ts from the delta journal')
+    parser.add_argument('--file', default=TRANSLATIONS_FILE)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('log', help='list recorded runs')
+    undo = commands.add_parser('undo', help='revert the last N runs')
+    undo.add_argument('count', nargs='?', type=int, default=1)
+    restore = commands.add_parser('restore', help='restore keys to their state after a run')
+    restore.add_argument('run', type=int, help='run id (0 = before the first run)')
+    restore.add_argument('--locale')
+    restore.add_argument('--key')
+    args = parser.parse_args()
+
+    journal = Journal(args.file)
+    if args.command == 'log':
+        for run in journal.runs():
+            print(f"{run['id']:4d}  {run['time']}  {len(run['changes']):5d} keys  {run['label']}")
+        return
+
+    if args.command == 'undo':
+        run = journal.undo(args.count)
+    else:
+        run = journal.restore(args.run, args.locale, args.key)
+    if run is None:
+        print("✓ Nothing to restore")
+    else:
+        print(f"✅ Done! Restored {len(run['changes'])} keys (recorded as run {run['id']}).")
+
+
+if __name__ == '__main__':
+    main()
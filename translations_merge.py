@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Per-key three-way merge of one locale between base, current and backup.
+
+Values are compared in their stored form (delimiter + raw literal body,
+see translations_journal.snapshot) through plain dicts, so a merge is
+linear in the number of keys. A key changed on only one side takes that
+side; a key changed differently on both sides is a conflict, keeps the
+current value and is reported.
+
+Without a base there is no telling which side changed a key, so only
+keys missing from current are taken from the backup; a key whose values
+differ keeps the current value and is reported as a conflict.
+"""
+from collections import namedtuple
+
+from translations_editor import TranslationsEditor
+
+Conflict = namedtuple('Conflict', 'locale key base current backup')
+
+
+def merge_values(base, current, backup, locale=None):
+    """Merge three key -> value dicts; returns (merged dict, [Conflict])"""
+    merged = {}
+    conflicts = []
+    keys = list(current) + [key for key in backup if key not in current]
+    if base is not None:
+        keys += [key for key in base if key not in current and key not in backup]
+
+    for key in keys:
+        ours = current.get(key)
+        theirs = backup.get(key)
+        if base is None:
+            value = ours if ours is not None else theirs
+            if ours is not None and theirs is not None and ours != theirs:
+                conflicts.append(Conflict(locale, key, None, ours, theirs))
+        else:
+            ancestor = base.get(key)
+            if ours == theirs or theirs == ancestor:
+                value = ours
+            elif ours == ancestor:
+                value = theirs
+            else:
+                value = ours
+                conflicts.append(Conflict(locale, key, ancestor, ours, theirs))
+        if value is not None:
+            merged[key] = value
+    return merged, conflicts
+
+
+def apply_merge(model, locale, merged, editor=None):
+    """Record the edits that turn `locale` of `model` into `merged`"""
+    if editor is None:
+        editor = TranslationsEditor(model)
+    section = model.section(locale)
+    for key in list(section.by_key):
+        if key not in merged:
+            editor.delete_key(locale, key)
+    for key, stored in merged.items():
+        entry = section.by_key.get(key)
+        if entry is None:
+            editor.add_key(locale, key, stored[1:], stored[0])
+        elif entry.quote + entry.raw != stored:
+            editor.set_raw(locale, key, stored[1:], stored[0])
+    return editor
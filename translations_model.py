@@ -0,0 +1,425 @@
+# -*- coding: utf-8 -*-
+"""
+Lexer and parser for translations.ts.
+
+One pass over the file produces an offset-indexed model:
+locale -> key -> Entry(value, raw source, spans, line). The tokenizer
+understands double/single-quoted strings with escapes, backtick template
+literals with nested ${...} expressions, and // and /* */ comments, so
+braces inside strings no longer confuse anything.
+
+Offsets are indices into the decoded text (Python str positions), which
+is what every tool slices and splices with.
+"""
+import bisect
+import re
+from collections import namedtuple
+
+TRANSLATIONS_FILE = 'translations.ts'
+
+
+class TranslationsSyntaxError(ValueError):
+    """Raised when translations.ts cannot be tokenized or parsed"""
+
+    def __init__(self, message, text, offset):
+        self.message = message
+        self.offset = offset
+        self.line, self.column = line_and_column(text, offset)
+        super().__init__(f"line {self.line}, column {self.column}: {message}")
+
+
+def line_and_column(text, offset):
+    """1-based line and column of an offset"""
+    line = text.count('\n', 0, offset) + 1
+    column = offset - (text.rfind('\n', 0, offset) + 1) + 1
+    return line, column
+
+
+Token = namedtuple('Token', 'kind text start end')
+
+# Single- and double-quoted strings; a backslash may escape a newline
+_STRING_RE = {
+    '"': re.compile(r'"(?:[^"\\\n]|\\.)*"', re.S),
+    "'": re.compile(r"'(?:[^'\\\n]|\\.)*'", re.S),
+}
+# Template literal without ${...}; anything else takes the slow path
+_SIMPLE_TEMPLATE_RE = re.compile(r'`(?:[^`\\$]|\\.|\$(?!\{))*`', re.S)
+_TOKEN_RE = re.compile(r'''
+    (?P<space>\s+)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*.*?\*/)
+  | (?P<ident>(?:[^\W\d]|\$)(?:\w|\$)*)
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<punct>[{}\[\]():,;=<>|?.+\-*/%!&~^])
+''', re.S | re.X)
+
+
+def _scan_template(text, start):
+    """Return the end offset of the template literal starting at `start`"""
+    match = _SIMPLE_TEMPLATE_RE.match(text, start)
+    if match:
+        return match.end()
+
+    pos = start + 1
+    length = len(text)
+    while pos < length:
+        ch = text[pos]
+        if ch == '\\':
+            pos += 2
+        elif ch == '`':
+            return pos + 1
+        elif ch == '$' and text.startswith('{', pos + 1):
+            pos = _scan_expression(text, pos + 2, start)
+        else:
+            pos += 1
+    raise TranslationsSyntaxError('unterminated template literal', text, start)
+
+
+def _scan_expression(text, pos, template_start):
+    """Skip a ${...} expression body, returning the offset after its '}'"""
+    depth = 1
+    for token in _tokens(text, pos):
+        if token.text == '{':
+            depth += 1
+        elif token.text == '}':
+            depth -= 1
+            if depth == 0:
+                return token.end
+    raise TranslationsSyntaxError('unterminated ${ in template literal', text, template_start)
+
+
+def _tokens(text, pos=0):
+    """Yield tokens from `pos`, skipping whitespace"""
+    length = len(text)
+    while pos < length:
+        ch = text[pos]
+        if ch in _STRING_RE:
+            match = _STRING_RE[ch].match(text, pos)
+            if not match:
+                raise TranslationsSyntaxError('unterminated string literal', text, pos)
+            yield Token('string', match.group(0), pos, match.end())
+            pos = match.end()
+            continue
+        if ch == '`':
+            end = _scan_template(text, pos)
+            yield Token('template', text[pos:end], pos, end)
+            pos = end
+            continue
+        if text.startswith('/*', pos) and text.find('*/', pos + 2) < 0:
+            raise TranslationsSyntaxError('unterminated block comment', text, pos)
+        match = _TOKEN_RE.match(text, pos)
+        if not match:
+            raise TranslationsSyntaxError(f'unexpected character {ch!r}', text, pos)
+        kind = match.lastgroup
+        if kind != 'space':
+            yield Token(kind, match.group(0), pos, match.end())
+        pos = match.end()
+
+
+def tokenize(text):
+    """Return every token of `text`, including comments"""
+    return list(_tokens(text))
+
+
+def iter_tokens(text, pos=0):
+    """Yield tokens lazily from `pos`; stop reading whenever you like"""
+    return _tokens(text, pos)
+
+
+_ESCAPES = {
+    'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v',
+    '0': '\0', '\n': '', '\\': '\\', "'": "'", '"': '"', '`': '`', '$': '$',
+}
+_ESCAPE_RE = re.compile(r'\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)', re.S)
+
+
+def _decode_escape(match):
+    body = match.group(1)
+    if body[0] in 'ux' and len(body) > 1:
+        return chr(int(body.strip('ux{}'), 16))
+    # Unknown escapes such as '\н' stand for the character itself, as in JS
+    return _ESCAPES.get(body, body)
+
+
+def decode_literal(raw):
+    """Cooked value of a literal body (the text between its delimiters)"""
+    if '\\' not in raw:
+        return raw
+    return _ESCAPE_RE.sub(_decode_escape, raw)
+
+
+_ENCODE_RE = {
+    '"': re.compile(r'[\\"\n\r\t]'),
+    "'": re.compile(r"[\\'\n\r\t]"),
+    '`': re.compile(r'\\|`|\$\{'),
+}
+_ENCODINGS = {'\\': '\\\\', '\n': '\\n', '\r': '\\r', '\t': '\\t',
+              '"': '\\"', "'": "\\'", '`': '\\`', '${': '\\${'}
+
+
+def encode_literal(value, quote='"'):
+    """Literal body for `value` between `quote` delimiters (inverse of decode_literal)"""
+    return _ENCODE_RE[quote].sub(lambda m: _ENCODINGS[m.group(0)], value)
+
+
+# Parts of a literal body that text conversions must leave alone
+_PROTECTED_RE = re.compile(r'''
+    (?P<escape>\\(?:u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.))
+  | (?P<placeholder>\{\{[^{}]*\}\})
+  | (?P<interpolation>\$\{)
+  | (?P<word>(?:[A-Za-z_]|\$(?!\{))(?:[A-Za-z0-9_]|\$(?!\{))*)
+''', re.S | re.X)
+# camelCase, snake_case, $names and words with digits are identifiers
+_IDENTIFIER_HINT_RE = re.compile(r'[_$0-9]|[a-z][A-Z]')
+
+
+def protected_spans(raw):
+    """Sorted (start, end) spans of a literal body that must not be rewritten.
+
+    Escape sequences, {{placeholder}} names, ${...} interpolations and ASCII
+    identifiers (docTypeResponseSchema, case_id) are protected; plain words
+    are not. A word never swallows the '$' of a following '${':
+
+    >>> protected_spans('ab${x}c')
+    [(2, 6)]
+    >>> protected_spans('case_id${n}')
+    [(0, 7), (7, 11)]
+    """
+    spans = []
+    pos = 0
+    while True:
+        match = _PROTECTED_RE.search(raw, pos)
+        if match is None:
+            return spans
+        start, end = match.span()
+        kind = match.lastgroup
+        if kind == 'interpolation':
+            try:
+                end = _scan_expression(raw, end, start)
+            except TranslationsSyntaxError:
+                # Damaged expression: protect up to the next '}' at least
+                close = raw.find('}', end)
+                end = len(raw) if close < 0 else close + 1
+        elif kind == 'word' and not _IDENTIFIER_HINT_RE.search(match.group(0)):
+            pos = end
+            continue
+        spans.append((start, end))
+        pos = end
+
+
+Entry = namedtuple('Entry', 'locale key value raw quote key_span value_span line')
+Entry.__doc__ = """One `key: value` pair.
+
+raw is the literal body as written, quote its delimiter ('"', "'" or '`'),
+key_span/value_span the (start, end) offsets of the key token and of the
+whole literal including delimiters.
+"""
+
+
+class Section:
+    """One locale object such as 'uz-cyrl': { ... }"""
+
+    def __init__(self, locale, key_span, body_span, line):
+        self.locale = locale
+        self.key_span = key_span
+        self.body_span = body_span
+        self.line = line
+        self.entries = []
+        self.by_key = {}
+        self.duplicates = []
+
+    def add(self, entry):
+        if entry.key in self.by_key:
+            self.duplicates.append(entry)
+        self.entries.append(entry)
+        # The last definition wins, as in an object literal
+        self.by_key[entry.key] = entry
+
+    def __contains__(self, key):
+        return key in self.by_key
+
+    def __getitem__(self, key):
+        return self.by_key[key]
+
+    def __len__(self):
+        return len(self.by_key)
+
+    def values(self):
+        """key -> cooked value"""
+        return {key: entry.value for key, entry in self.by_key.items()}
+
+
+class TranslationsModel:
+    """Parsed translations.ts"""
+
+    def __init__(self, text):
+        self.text = text
+        self.sections = []
+        self.locales = {}
+        self.duplicate_locales = {}
+        self.comments = []
+        self.nested_sections = []
+        self.errors = []
+        self.object_span = None
+        self._newlines = None
+
+    def add_section(self, section):
+        if section.locale in self.locales:
+            self.duplicate_locales.setdefault(
+                section.locale, [self.locales[section.locale]]).append(section)
+        self.sections.append(section)
+        self.locales[section.locale] = section
+
+    def section(self, locale):
+        return self.locales.get(locale)
+
+    def get(self, locale, key):
+        section = self.locales.get(locale)
+        return section.by_key.get(key) if section else None
+
+    def entries(self):
+        """Every entry in file order, duplicates included"""
+        for section in self.sections:
+            yield from section.entries
+
+    def line_of(self, offset):
+        """1-based line number of an offset"""
+        if self._newlines is None:
+            self._newlines = [m.start() for m in re.finditer('\n', self.text)]
+        return bisect.bisect_left(self._newlines, offset) + 1
+
+
+def _literal_text(token):
+    """Key text of an identifier, string or number token"""
+    if token.kind in ('string', 'template'):
+        return decode_literal(token.text[1:-1])
+    return token.text
+
+
+class _Parser:
+    def __init__(self, text, strict):
+        self.text = text
+        self.strict = strict
+        self.model = TranslationsModel(text)
+        self.tokens = []
+        for token in _tokens(text):
+            if token.kind.endswith('comment'):
+                self.model.comments.append((token.start, token.end))
+            else:
+                self.tokens.append(token)
+        self.pos = 0
+
+    def error(self, message, offset=None):
+        if offset is None:
+            offset = self.peek().start if not self.at_end() else len(self.text)
+        return TranslationsSyntaxError(message, self.text, offset)
+
+    def peek(self):
+        return self.tokens[self.pos]
+
+    def at_end(self):
+        return self.pos >= len(self.tokens)
+
+    def at_statement_end(self):
+        return self.at_end() or self.peek().text == ';'
+
+    def take(self):
+        if self.at_end():
+            raise self.error('unexpected end of file')
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def expect(self, text):
+        if self.at_end():
+            raise self.error(f'expected {text!r} but reached end of file')
+        token = self.take()
+        if token.text != text:
+            raise self.error(f'expected {text!r} but found {token.text!r}', token.start)
+        return token
+
+    def parse(self):
+        # Skip `export const translations: <type> =`
+        while not self.at_end() and self.peek().text != '=':
+            self.pos += 1
+        self.expect('=')
+        opening = self.expect('{')
+        self.model.object_span = (opening.start, self.parse_block(opening, self.parse_section))
+        if not self.at_end() and self.peek().text == ';':
+            self.take()
+        if not self.at_end():
+            raise self.error(f'unexpected {self.peek().text!r} after the translations object')
+        return self.model
+
+    def parse_block(self, opening, parse_item):
+        """Parse `item, item, ... }` and return the offset after the '}'"""
+        while True:
+            if self.at_statement_end():
+                # Reaching ';' or EOF means this brace was never closed
+                error = self.error("'{' is never closed", opening.start)
+                if self.strict:
+                    raise error
+                self.model.errors.append(error)
+                return self.peek().start if not self.at_end() else len(self.text)
+            if self.peek().text == '}':
+                return self.take().end
+            parse_item()
+            if self.at_statement_end():
+                continue
+            token = self.peek()
+            if token.text == ',':
+                self.take()
+            elif token.text != '}':
+                raise self.error(f"expected ',' or '}}' but found {token.text!r}", token.start)
+
+    def parse_key(self):
+        token = self.take()
+        if token.kind not in ('ident', 'string', 'number'):
+            raise self.error(f'expected a key but found {token.text!r}', token.start)
+        self.expect(':')
+        return token
+
+    def parse_section(self, key=None):
+        if key is None:
+            key = self.parse_key()
+        opening = self.expect('{')
+        section = Section(_literal_text(key), (key.start, key.end), None,
+                          self.model.line_of(key.start))
+        end = self.parse_block(opening, lambda: self.parse_entry(section))
+        section.body_span = (opening.start, end)
+        self.model.add_section(section)
+
+    def parse_entry(self, section):
+        key = self.parse_key()
+        if self.at_end():
+            raise self.error('expected a value but reached end of file')
+        if self.peek().text == '{':
+            # A locale block pasted inside another one; keep it as its own
+            # section so duplicate-locale checks can see it
+            self.parse_section(key)
+            self.model.nested_sections.append(self.model.sections[-1])
+            return
+        value = self.take()
+        if value.kind not in ('string', 'template'):
+            raise self.error(f'expected a string value but found {value.text!r}', value.start)
+        raw = value.text[1:-1]
+        section.add(Entry(
+            section.locale, _literal_text(key), decode_literal(raw), raw,
+            value.text[0], (key.start, key.end), (value.start, value.end),
+            self.model.line_of(key.start),
+        ))
+
+
+def parse_translations(text, strict=True):
+    """Parse the source of translations.ts into a TranslationsModel.
+
+    With strict=False an unclosed '{' is recorded in model.errors and closed
+    implicitly, which is enough to read sections out of damaged backups.
+    """
+    return _Parser(text, strict).parse()
+
+
+def load_translations(filename=TRANSLATIONS_FILE, strict=True):
+    """Read and parse a translations file"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        return parse_translations(f.read(), strict)
@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+"""
+Watch translations.ts and re-check it incrementally on every save.
+
+The parsed model stays in memory. On a change the old and new text are
+compared to find the edited region, only the entries around it are
+re-lexed and re-parsed, every later entry keeps its parse with shifted
+offsets, and the parity, placeholder and mixed-script checks run again
+for the affected keys alone. Edits that touch a locale key, a brace or
+anything outside a locale block fall back to a full parse, as does the
+first save after a syntax error.
+
+Saves are noticed through inotify (libc via ctypes, on Linux) or, where
+that is unavailable, by polling the file's stat. Each report is written
+to a JSON file the editor can poll, or sent as one JSON line to every
+client of a Unix socket (new clients get the latest report at once).
+
+    python translations_watch.py [--file translations.ts]
+                                 [--output .translations_watch.json | --socket PATH]
+                                 [--poll] [--interval SECONDS]
+"""
+import argparse
+import bisect
+import ctypes
+import ctypes.util
+import json
+import os
+import re
+import select
+import signal
+import socket
+import struct
+import sys
+import time
+
+from locale_parity import REFERENCE_LOCALE, parity
+from mixed_script import detect
+from placeholders import call_sites, check
+from translations_editor import write_atomic
+from translations_model import (TRANSLATIONS_FILE, Entry, TranslationsSyntaxError, decode_literal,
+                                iter_tokens, parse_translations)
+
+OUTPUT_FILE = '.translations_watch.json'
+POLL_INTERVAL = 0.2
+CHECKS = ('parity', 'placeholders', 'mixed_script')
+
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct('iIII')
+
+# One locale block as a sequence of entries (E) and commas
+_BLOCK_RE = re.compile(r'\{(?:E(?:,E)*,?)?\}')
+# Issue fields holding line numbers
+_LINE_FIELDS = ('line', 'other_line')
+
+
+class InotifyWatcher:
+    """Saves of one file, through inotify on its directory"""
+
+    def __init__(self, filename):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError('inotify is not available')
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        # Watch the directory: editors and write_atomic replace the file
+        directory = os.path.dirname(os.path.abspath(filename))
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), _IN_CLOSE_WRITE | _IN_MOVED_TO) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f'cannot watch {directory}')
+        self.name = os.fsencode(os.path.basename(filename))
+        self.timeout = None
+
+    def fileno(self):
+        return self.fd
+
+    def changed(self):
+        """Drain pending events; True if any of them was about the file"""
+        found = False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return found
+            pos = 0
+            while pos < len(data):
+                length = _EVENT.unpack_from(data, pos)[3]
+                name = data[pos + _EVENT.size:pos + _EVENT.size + length].rstrip(b'\0')
+                found = found or name == self.name
+                pos += _EVENT.size + length
+
+
+class PollingWatcher:
+    """Saves of one file, by comparing its stat every `interval` seconds"""
+
+    def __init__(self, filename, interval=POLL_INTERVAL):
+        self.filename = filename
+        self.timeout = interval
+        self._stamp = self._stat()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def fileno(self):
+        return None
+
+    def changed(self):
+        stamp = self._stat()
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        return True
+
+
+def watcher_for(filename, poll=False, interval=POLL_INTERVAL):
+    if not poll:
+        try:
+            return InotifyWatcher(filename)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(filename, interval)
+
+
+class _FullParse(Exception):
+    """The edit cannot be handled incrementally"""
+
+
+def _common_prefix(a, b):
+    """Length of the common prefix, by binary search over C-speed compares"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix(a, b, limit):
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:] == b[len(b) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _key_text(token):
+    if token.kind == 'string':
+        return decode_literal(token.text[1:-1])
+    return token.text
+
+
+def _shift_span(span, delta):
+    return span[0] + delta, span[1] + delta
+
+
+class IncrementalChecker:
+    """Parsed model plus check results, updated edit by edit"""
+
+    def __init__(self, text, sites=(), reference=REFERENCE_LOCALE):
+        self.sites = list(sites)
+        self.reference = reference
+        self.text = None
+        self.model = None
+        self.error = None
+        self.issues = {name: {} for name in CHECKS}
+        self.full(text)
+
+    def full(self, text):
+        """Parse and check everything; returns None (every key affected).
+
+        A syntax error leaves no issues behind, exactly as a fresh checker
+        on the same text would report:
+
+        >>> checker = IncrementalChecker("export const translations = { en: { a: 'x' }, ru: { b: 'y' } };")
+        >>> checker.report()['counts']['parity']
+        2
+        >>> broken = "export const translations = { en: { a: 'x' }, ru: { b: 'y' };"
+        >>> checker.update(broken)
+        >>> checker.report() == IncrementalChecker(broken).report()
+        True
+        """
+        self.text = text
+        try:
+            self.model = parse_translations(text)
+        except TranslationsSyntaxError as error:
+            self.model = None
+            self.error = error
+            self.issues = {name: {} for name in CHECKS}
+            return None
+        self.error = None
+        self._run_checks(None)
+        return None
+
+    def update(self, text):
+        """Re-check after a save; returns the affected keys (None: all of them)"""
+        if text == self.text:
+            return set()
+        if self.model is None:
+            return self.full(text)
+        try:
+            keys = self._splice(text)
+        except (_FullParse, TranslationsSyntaxError):
+            return self.full(text)
+        self._run_checks(keys)
+        return keys
+
+    def _splice(self, text):
+        """Re-parse only the entries around the edit; returns their keys"""
+        old, model = self.text, self.model
+        if model.nested_sections or model.errors:
+            raise _FullParse
+        start = _common_prefix(old, text)
+        suffix = _common_suffix(old, text, min(len(old), len(text)) - start)
+        old_end = len(old) - suffix
+        delta = len(text) - len(old)
+
+        for section in model.sections:
+            body_start, body_end = section.body_span
+            if body_start < start and old_end < body_end:
+                break
+        else:
+            raise _FullParse
+        entries = section.entries
+        first = bisect.bisect_left([entry.value_span[1] for entry in entries], start)
+        last = bisect.bisect_right([entry.key_span[0] for entry in entries], old_end) - 1
+        window_start = entries[first - 1].value_span[1] if first > 0 else body_start + 1
+        window_end = entries[last + 1].key_span[0] if last + 1 < len(entries) else body_end - 1
+        new_window_end = window_end + delta
+
+        tokens, comments = [], []
+        for token in iter_tokens(text, window_start):
+            if token.start >= new_window_end:
+                break
+            if token.end > new_window_end:
+                raise _FullParse
+            if token.kind.endswith('comment'):
+                comments.append((token.start, token.end))
+            else:
+                tokens.append(token)
+
+        found, symbols, pos = [], [], 0
+        while pos < len(tokens):
+            if tokens[pos].text == ',':
+                symbols.append(',')
+                pos += 1
+                continue
+            key, colon, value = (tokens[pos:pos + 3] + [None, None])[:3]
+            if (colon is None or value is None or key.kind not in ('ident', 'string', 'number')
+                    or colon.text != ':' or value.kind not in ('string', 'template')):
+                raise _FullParse
+            found.append((key, value))
+            symbols.append('E')
+            pos += 3
+        sequence = ('{E' if first > 0 else '{') + ''.join(symbols) + ('E}' if last + 1 < len(entries) else '}')
+        if not _BLOCK_RE.fullmatch(sequence):
+            raise _FullParse
+
+        # Commit: the edit is well formed, so swap in the new text
+        line_delta = text.count('\n', start, old_end + delta) - old.count('\n', start, old_end)
+        edit_line = model.line_of(start)
+        model.text = self.text = text
+        model._newlines = None
+        fresh = []
+        for key, value in found:
+            raw = value.text[1:-1]
+            fresh.append(Entry(section.locale, _key_text(key), decode_literal(raw), raw, value.text[0],
+                               (key.start, key.end), (value.start, value.end), model.line_of(key.start)))
+        removed = entries[first:last + 1]
+        section.entries = []
+        section.by_key = {}
+        section.duplicates = []
+        for entry in entries[:first] + fresh + self._shifted(entries[last + 1:], delta, line_delta):
+            section.add(entry)
+        section.body_span = (body_start, body_end + delta)
+
+        for other in model.sections:
+            if other.body_span[0] > body_start:
+                other.key_span = _shift_span(other.key_span, delta)
+                other.body_span = _shift_span(other.body_span, delta)
+                other.line += line_delta
+                kept = self._shifted(other.entries, delta, line_delta)
+                if other.duplicates:
+                    other.entries, other.by_key, other.duplicates = [], {}, []
+                    for entry in kept:
+                        other.add(entry)
+                else:
+                    other.entries = kept
+                    other.by_key = {entry.key: entry for entry in kept}
+        model.object_span = (model.object_span[0], model.object_span[1] + delta)
+        model.comments = ([span for span in model.comments if span[1] <= window_start] + comments
+                          + [_shift_span(span, delta) for span in model.comments if span[0] >= window_end])
+        self._shift_issues(edit_line, line_delta, old_end, delta)
+        return {entry.key for entry in removed} | {entry.key for entry in fresh}
+
+    @staticmethod
+    def _shifted(entries, delta, line_delta):
+        if not delta and not line_delta:
+            return list(entries)
+        return [Entry(locale, key, value, raw, quote, (key_start + delta, key_end + delta),
+                      (value_start + delta, value_end + delta), line + line_delta)
+                for locale, key, value, raw, quote, (key_start, key_end), (value_start, value_end), line
+                in entries]
+
+    def _shift_issues(self, edit_line, line_delta, old_end, delta):
+        """Move the stored results of untouched keys past the edit"""
+        if not delta and not line_delta:
+            return
+        for by_key in self.issues.values():
+            for items in by_key.values():
+                for index, item in enumerate(items):
+                    changes = {}
+                    offset = getattr(item, 'offset', None)
+                    if offset is not None:
+                        if offset >= old_end:
+                            changes['offset'] = offset + delta
+                            changes['line'] = item.line + line_delta
+                    elif line_delta:
+                        for field in _LINE_FIELDS:
+                            line = getattr(item, field, None)
+                            if line is not None and line > edit_line:
+                                changes[field] = line + line_delta
+                    if changes:
+                        items[index] = item._replace(**changes)
+
+    def _run_checks(self, keys):
+        found = {
+            'parity': parity(self.model, self.reference, keys),
+            'placeholders': check(self.model, self.sites, self.reference, keys),
+            'mixed_script': detect(self.model, keys),
+        }
+        for name, items in found.items():
+            by_key = self.issues[name]
+            if keys is None:
+                by_key.clear()
+            else:
+                for key in keys:
+                    by_key.pop(key, None)
+            for item in items:
+                by_key.setdefault(item.key, []).append(item)
+
+    def report(self):
+        """JSON-ready dict of the current results"""
+        error = None
+        if self.error is not None:
+            error = {'line': self.error.line, 'column': self.error.column, 'message': self.error.message}
+        issues = {}
+        for name, by_key in self.issues.items():
+            items = [item._asdict() for key_items in by_key.values() for item in key_items]
+            items.sort(key=lambda item: item['line'] or 0)
+            issues[name] = items
+        return {'error': error, 'issues': issues, 'counts': {name: len(items) for name, items in issues.items()}}
+
+
+class SocketSink:
+    """Unix socket server broadcasting each report as one JSON line"""
+
+    def __init__(self, path):
+        if os.path.exists(path):
+            os.unlink(path)
+        self.path = path
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen()
+        self.server.setblocking(False)
+        self.clients = []
+        self.last = None
+
+    def fileno(self):
+        return self.server.fileno()
+
+    def accept(self):
+        client, _ = self.server.accept()
+        self.clients.append(client)
+        if self.last is not None:
+            self._send(client, self.last)
+
+    def _send(self, client, data):
+        try:
+            client.sendall(data)
+        except OSError:
+            self.clients.remove(client)
+            client.close()
+
+    def publish(self, report):
+        self.last = (json.dumps(report, ensure_ascii=False) + '\n').encode('utf-8')
+        for client in list(self.clients):
+            self._send(client, self.last)
+
+    def close(self):
+        for client in self.clients:
+            client.close()
+        self.server.close()
+        os.unlink(self.path)
+
+
+class FileSink:
+    """JSON file rewritten atomically after each check"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def fileno(self):
+        return None
+
+    def publish(self, report):
+        write_atomic(self.path, json.dumps(report, ensure_ascii=False, indent=2) + '\n')
+
+    def close(self):
+        pass
+
+
+def _read(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def watch(filename, sink, watcher, log=print):
+    root = os.path.dirname(os.path.abspath(filename))
+    started = time.perf_counter()
+    checker = IncrementalChecker(_read(filename), call_sites(root))
+
+    def publish(keys, seconds):
+        report = checker.report()
+        report.update(file=filename, updated=time.time(), elapsed_ms=round(seconds * 1000, 2),
+                      keys=None if keys is None else sorted(keys))
+        sink.publish(report)
+        counts = ', '.join(f"{count} {name}" for name, count in report['counts'].items())
+        scope = 'full check' if keys is None else f"{len(keys)} keys"
+        status = f"syntax error line {checker.error.line}" if checker.error else counts
+        log(f"{scope} in {seconds * 1000:.1f} ms: {status}")
+
+    publish(None, time.perf_counter() - started)
+    readable = [source for source in (watcher, sink) if source.fileno() is not None]
+    while True:
+        if readable:
+            ready = select.select(readable, [], [], watcher.timeout)[0]
+        else:
+            time.sleep(watcher.timeout)
+            ready = []
+        if sink in ready:
+            sink.accept()
+        if (watcher in ready or watcher.fileno() is None) and watcher.changed():
+            try:
+                text = _read(filename)
+            except FileNotFoundError:
+                continue
+            started = time.perf_counter()
+            keys = checker.update(text)
+            if keys is None or keys:
+                publish(keys, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-check translations.ts incrementally on every save')
+    parser.add_argument('--file', default=TRANSLATIONS_FILE)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--output', default=OUTPUT_FILE, help='JSON file rewritten after each check')
+    target.add_argument('--socket', help='Unix socket to broadcast reports on instead')
+    parser.add_argument('--poll', action='store_true', help='poll the file instead of using inotify')
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL, help='seconds between polls')
+    args = parser.parse_args()
+
+    sink = SocketSink(args.socket) if args.socket else FileSink(args.output)
+    watcher = watcher_for(args.file, args.poll, args.interval)
+    print(f"Watching {args.file} ({'inotify' if watcher.fileno() is not None else 'polling'}), "
+          f"reports to {args.socket or args.output}")
+    # Leave through the finally below on `kill` too, so the socket is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        watch(args.file, sink, watcher)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Longest-match transliterator compiled once from a mapping table.
+
+The mapping is turned into a trie-shaped state machine (see
+replacement_engine) when the Transliterator is built, so every call is a
+single left-to-right pass where 'shch', 'sh' and 's' resolve to the
+longest key that matches at each position.
+"""
+from replacement_engine import Replacer, unprotected_spans
+
+# Never part of a mapping key, so matches cannot cross value boundaries
+_SEPARATOR = '\x00'
+
+
+class Transliterator(Replacer):
+    """A Replacer with helpers for converting many values at once"""
+
+    def __init__(self, mapping, pattern_source=None):
+        super().__init__(mapping, pattern_source)
+        if any(_SEPARATOR in key for key in self.table):
+            raise ValueError('Transliteration keys may not contain NUL')
+
+        # Fast path: multi-character keys go through the state machine and
+        # the single characters left over through str.translate. This is
+        # only equivalent when no output can be re-read as an input letter.
+        singles = {k: v for k, v in self.table.items() if len(k) == 1}
+        multis = {k: v for k, v in self.table.items() if len(k) > 1}
+        outputs = ''.join(self.table.values())
+        self._char_table = None
+        if singles and not any(ch in singles for ch in outputs):
+            self._char_table = str.maketrans(singles)
+            self._multi = Replacer(multis)
+
+    def transliterate(self, text, protected=None):
+        """Convert one string, leaving sorted `protected` spans untouched"""
+        if self.pattern is None:
+            return text
+        if protected:
+            pieces = []
+            pos = 0
+            for start, end in unprotected_spans(text, protected):
+                pieces.append(text[pos:start])
+                pieces.append(self._convert(text[start:end]))
+                pos = end
+            pieces.append(text[pos:])
+            return ''.join(pieces)
+        return self._convert(text)
+
+    def _convert(self, text):
+        if self._char_table is not None:
+            multi = self._multi
+            if multi.pattern is not None:
+                table = multi.table
+                text = multi.pattern.sub(lambda m: table[m.group(0)], text)
+            return text.translate(self._char_table)
+        table = self.table
+        return self.pattern.sub(lambda m: table[m.group(0)], text)
+
+    def transliterate_many(self, values, protected=None):
+        """Convert an iterable of strings, returning a list in the same order.
+
+        `protected`, when given, holds one list of spans per value.
+        """
+        values = list(values)
+        if not values:
+            return []
+        protected = list(protected) if protected is not None else [()] * len(values)
+        if any(_SEPARATOR in value for value in values):
+            return [self.transliterate(value, spans) for value, spans in zip(values, protected)]
+        # One regex pass over the joined batch instead of one per value;
+        # protected spans are shifted to their offset in the batch
+        shifted = []
+        offset = 0
+        for value, spans in zip(values, protected):
+            shifted.extend((start + offset, end + offset) for start, end in spans)
+            offset += len(value) + 1
+        return self.transliterate(_SEPARATOR.join(values), shifted).split(_SEPARATOR)
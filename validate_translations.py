@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Structural validator for translations.ts.
+
+Counting backticks misleads as soon as a template contains an escaped
+backtick or spans many lines. This walks the file once with the TS
+literal lexer from translations_model and a bracket stack, and reports
+each problem at the offset where it starts:
+
+  unterminated_string    a '...' or "..." literal never closed on its line
+  unterminated_template  a `...` literal (or a ${ inside one) never closed
+  unterminated_comment   a /* comment never closed
+  unexpected_character   a character no TS token starts with
+  swallowed_entries      a `...` literal containing lines that look like
+                         entries: a template whose closing backtick went
+                         missing, reported at its opening backtick; the scan
+                         resumes at the first swallowed entry, so the
+                         backticks after it raise no follow-on problems
+  unclosed_bracket       a { [ ( never closed, at the opening bracket; when
+                         a later line is indented no deeper than the line of
+                         the bracket still open around it (the next locale
+                         key), that bracket is blamed instead of the outer
+                         one that absorbed its closer
+  unmatched_bracket      a } ] ) closing nothing, or the wrong bracket
+  stray_token            anything after the `};` ending the object, once
+  syntax                 any other parse error, once the structure is sound
+
+An unterminated string ends at its line, so scanning resumes on the next
+line; an unterminated template or comment swallows the rest of the file
+and ends the scan.
+
+    python validate_translations.py [FILE ...] [--json]
+"""
+import argparse
+import json
+import re
+import sys
+from collections import namedtuple
+
+from translations_model import (TRANSLATIONS_FILE, TranslationsSyntaxError, iter_tokens,
+                                line_and_column, parse_translations)
+
+Problem = namedtuple('Problem', 'kind line column offset message')
+
+_OPENERS = {'{': '}', '[': ']', '(': ')'}
+_CLOSERS = {closer: opener for opener, closer in _OPENERS.items()}
+# An indented `key: '...` line, which no template value legitimately holds
+_ENTRY_LINE_RE = re.compile(r'\n[ \t]+[A-Za-z_$][\w$]*[ \t]*:[ \t]*[`\'"]')
+_LEXER_KINDS = (
+    ('unterminated string', 'unterminated_string'),
+    ('unterminated template', 'unterminated_template'),
+    ('unterminated ${', 'unterminated_template'),
+    ('unterminated block comment', 'unterminated_comment'),
+    ('unexpected character', 'unexpected_character'),
+)
+
+
+def _problem(kind, text, offset, message):
+    return Problem(kind, *line_and_column(text, offset), offset, message)
+
+
+def _lexer_kind(message):
+    for prefix, kind in _LEXER_KINDS:
+        if message.startswith(prefix):
+            return kind
+    return 'syntax'
+
+
+def _indent(text, offset):
+    """Indentation of the line holding `offset`, or None if code precedes it"""
+    start = text.rfind('\n', 0, offset) + 1
+    prefix = text[start:offset]
+    return len(prefix) if not prefix.strip() else None
+
+
+def _line_indent(text, offset):
+    start = text.rfind('\n', 0, offset) + 1
+    line = text[start:offset]
+    return len(line) - len(line.lstrip())
+
+
+def structure(text):
+    """Problems found by the lexer and bracket stack, in file order"""
+    problems = []
+    stack = []
+    # First pair whose closer is not indented like its opener's line: an
+    # unclosed bracket usually sits just before it
+    misindented = None
+    # First token starting a line no deeper than the line of the bracket
+    # still open around it, such as the next locale key: that bracket was
+    # never closed
+    unclosed_hint = None
+    assigned = False
+    finished = None
+    pos = 0
+    while pos is not None:
+        resume = None
+        try:
+            for token in iter_tokens(text, pos):
+                if token.kind.endswith('comment'):
+                    continue
+                if finished is not None:
+                    # Only the first: whatever follows it is part of the same stray text
+                    problems.append(_problem('stray_token', text, token.start,
+                                             f"{token.text[:20]!r} after the end of the translations object"
+                                             f" (line {finished})"))
+                    break
+                if token.kind == 'template':
+                    entry = _ENTRY_LINE_RE.search(token.text)
+                    if entry is not None:
+                        entry_start = token.start + entry.start() + 1
+                        problems.append(_problem(
+                            'swallowed_entries', text, token.start,
+                            f"template literal runs over an entry on line "
+                            f"{line_and_column(text, entry_start)[0]}"))
+                        # Take the template as closed before that entry and
+                        # resume there, so the backticks after it are not
+                        # paired the wrong way round and reported again
+                        resume = entry_start
+                        break
+                    continue
+                indent = _indent(text, token.start)
+                if (unclosed_hint is None and stack and indent is not None and token.text not in _CLOSERS
+                        and indent <= _line_indent(text, stack[-1].start)):
+                    unclosed_hint = stack[-1], token
+                if token.text in _OPENERS:
+                    stack.append(token)
+                elif token.text in _CLOSERS:
+                    if not stack:
+                        problems.append(_problem('unmatched_bracket', text, token.start,
+                                                 f"{token.text!r} closes nothing"))
+                    elif stack[-1].text != _CLOSERS[token.text]:
+                        opening = stack.pop()
+                        problems.append(_problem(
+                            'unmatched_bracket', text, token.start,
+                            f"{token.text!r} closes {opening.text!r} from line {line_and_column(text, opening.start)[0]}"))
+                    else:
+                        opening = stack.pop()
+                        if (misindented is None and indent is not None
+                                and indent != _line_indent(text, opening.start)):
+                            misindented = opening, token
+                elif token.text == '=' and not stack:
+                    assigned = True
+                elif token.text == ';' and not stack and assigned:
+                    finished = line_and_column(text, token.start)[0]
+        except TranslationsSyntaxError as error:
+            if finished is not None:
+                stray = text[error.offset:].partition('\n')[0]
+                problems.append(_problem('stray_token', text, error.offset,
+                                         f"{stray[:20]!r} after the end of the translations object"
+                                         f" (line {finished})"))
+                break
+            kind = _lexer_kind(error.message)
+            entry = _ENTRY_LINE_RE.search(text, error.offset) if kind == 'unterminated_template' else None
+            if entry is not None:
+                # Same as a template closed by a later backtick: resume at
+                # the first entry it swallowed instead of ending the scan
+                resume = entry.start() + 1
+                problems.append(_problem('swallowed_entries', text, error.offset,
+                                         f"template literal runs over an entry on line "
+                                         f"{line_and_column(text, resume)[0]}"))
+                pos = resume
+                continue
+            problems.append(_problem(kind, text, error.offset, error.message))
+            if kind in ('unterminated_string', 'unexpected_character'):
+                line_end = text.find('\n', error.offset)
+                resume = None if line_end < 0 else line_end + 1
+                if kind == 'unexpected_character':
+                    resume = error.offset + 1
+        pos = resume
+    if stack and unclosed_hint is not None:
+        # The bracket left open is the hinted one; the outer bracket that
+        # ends up unclosed only absorbed its missing closer
+        opening, token = unclosed_hint
+        problems.append(_problem(
+            'unclosed_bracket', text, opening.start,
+            f"{opening.text!r} is never closed before {token.text[:20]!r} on line"
+            f" {line_and_column(text, token.start)[0]}, which is indented like its line"))
+        stack.pop()
+        misindented = None
+    for opening in reversed(stack):
+        message = f"{opening.text!r} is never closed"
+        if misindented is not None:
+            inner, closer = misindented
+            message += (f"; indentation suggests the {inner.text!r} on line {line_and_column(text, inner.start)[0]}"
+                        f" (closed on line {line_and_column(text, closer.start)[0]})")
+        problems.append(_problem('unclosed_bracket', text, opening.start, message))
+    problems.sort(key=lambda problem: problem.offset)
+    return problems
+
+
+def validate(text):
+    """Structural problems, or the first parse error once there are none"""
+    problems = structure(text)
+    if not problems:
+        try:
+            parse_translations(text)
+        except TranslationsSyntaxError as error:
+            problems.append(_problem('syntax', text, error.offset, error.message))
+    return problems
+
+
+def validate_file(filename=TRANSLATIONS_FILE):
+    with open(filename, 'r', encoding='utf-8') as f:
+        return validate(f.read())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Report unterminated literals, brackets and stray tokens')
+    parser.add_argument('files', nargs='*', default=[TRANSLATIONS_FILE])
+    parser.add_argument('--json', action='store_true', help='print machine-readable output')
+    args = parser.parse_args(argv)
+
+    found = {filename: validate_file(filename) for filename in args.files}
+    if args.json:
+        print(json.dumps({filename: [problem._asdict() for problem in problems]
+                          for filename, problems in found.items()}, ensure_ascii=False, indent=2))
+    else:
+        for filename, problems in found.items():
+            for problem in problems:
+                print(f"{filename}:{problem.line}:{problem.column}: {problem.kind}: {problem.message}")
+            if not problems:
+                print(f"✓ {filename} is structurally sound")
+    sys.exit(1 if any(found.values()) else 0)
+
+
+if __name__ == '__main__':
+    main()